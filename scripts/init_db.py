@@ -1,5 +1,6 @@
 """Initialize database and create tables."""
 
+import argparse
 import sys
 from pathlib import Path
 import logging
@@ -9,6 +10,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.settings import settings
 from src.database.connection import db_manager
+from src.database.repository import ChunkRepository
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +22,14 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Initialize database."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--renormalize",
+        action="store_true",
+        help="Recompute content_normalized for all chunks (after normalization rules change)",
+    )
+    args = parser.parse_args()
+    
     logger.info("Initializing database...")
     
     try:
@@ -32,6 +42,18 @@ def main():
         db_manager.create_tables()
         logger.info("Tables created successfully")
         
+        # Bring existing tables up to date
+        logger.info("Applying schema updates...")
+        db_manager.upgrade_schema()
+        session = db_manager.get_session()
+        try:
+            updated = ChunkRepository(session).backfill_normalized_content(
+                recompute=args.renormalize
+            )
+            logger.info(f"Backfilled normalized content for {updated} chunks")
+        finally:
+            session.close()
+        
         # Initialize pgvector extension
         logger.info("Initializing pgvector extension...")
         try:
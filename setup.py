@@ -38,7 +38,7 @@ setup(
         "alembic>=1.13.1",
         "camel-tools>=1.5.2",
         "farasa>=0.1.5",
-        "openai>=1.10.0",
+        "openai>=1.17.0",
         "anthropic>=0.18.1",
         "ragas>=0.1.7",
         "evaluate>=0.4.1",
@@ -52,5 +52,8 @@ setup(
             "pytest-asyncio>=0.23.3",
             "pytest-cov>=4.1.0",
         ],
+        "onnx": [
+            "sentence-transformers[onnx]>=3.2.0",
+        ],
     },
 )
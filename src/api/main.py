@@ -1,13 +1,15 @@
 """FastAPI application for Pyxon AI Document Parser."""
 
 from typing import Optional, List
+import asyncio
+import json
 import os
 import tempfile
 import logging
 from pathlib import Path
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, status
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -277,35 +279,42 @@ class QueryRequest(BaseModel):
     model: Optional[str] = None
 
 
+def validate_query_request(body: QueryRequest):
+    """Validate query inputs, raising HTTPException on bad input."""
+    if not body.question or len(body.question.strip()) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Question cannot be empty"
+        )
+    
+    if len(body.question) > 1000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Question too long (max 1000 characters)"
+        )
+    
+    if not isinstance(body.top_k, int) or body.top_k < 1 or body.top_k > 20:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="top_k must be between 1 and 20"
+        )
+
+
 @app.post("/api/query")
 @limiter.limit("20/minute")
-def query(request: Request, body: QueryRequest):
+async def query(request: Request, body: QueryRequest):
     """Query documents."""
-    session = get_session()
+    # Session setup and pipeline construction block (DB, model load); run them in a thread
+    session = await asyncio.to_thread(get_session)
     try:
         # Security: Validate inputs
-        if not body.question or len(body.question.strip()) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Question cannot be empty"
-            )
-        
-        if len(body.question) > 1000:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Question too long (max 1000 characters)"
-            )
-        
-        if not isinstance(body.top_k, int) or body.top_k < 1 or body.top_k > 20:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="top_k must be between 1 and 20"
-            )
+        validate_query_request(body)
         
         logger.info(f"Processing query: {body.question[:50]}...")
         
-        rag = RAGPipeline(session)
-        result = rag.query(
+        rag = await asyncio.to_thread(RAGPipeline, session)
+        # Async path: vector and keyword search run concurrently on asyncpg
+        result = await rag.aquery(
             question=body.question,
             top_k=body.top_k,
             document_id=body.document_id,
@@ -324,6 +333,36 @@ def query(request: Request, body: QueryRequest):
         session.close()
 
 
+@app.post("/api/query/stream")
+@limiter.limit("20/minute")
+def query_stream(request: Request, body: QueryRequest):
+    """Query documents and stream the answer as Server-Sent Events."""
+    # Security: Validate inputs
+    validate_query_request(body)
+    
+    logger.info(f"Processing streaming query: {body.question[:50]}...")
+    
+    def event_stream():
+        session = get_session()
+        try:
+            rag = RAGPipeline(session)
+            for event, data in rag.stream_query(
+                question=body.question,
+                top_k=body.top_k,
+                document_id=body.document_id,
+                model=body.model,
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps('Failed to process query')}\n\n"
+        finally:
+            session.close()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/api/benchmarks")
 @limiter.limit("5/minute")
 def run_benchmarks(request: Request):
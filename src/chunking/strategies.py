@@ -1,11 +1,11 @@
 """Chunking strategies for document processing."""
 
 import re
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from enum import Enum
 
 from src.models.document import Document, Chunk, ChunkMetadata, ChunkingStrategy
-from src.utils.text_utils import estimate_tokens, detect_arabic, detect_diacritics
+from src.utils.text_utils import analyze_text
 
 
 class ChunkStrategy(Enum):
@@ -25,7 +25,10 @@ class FixedChunker:
 
     def chunk(self, document: Document) -> List[Chunk]:
         """Split document into fixed-size chunks."""
-        chunks = []
+        return list(self.iter_chunks(document))
+
+    def iter_chunks(self, document: Document) -> Iterator[Chunk]:
+        """Yield fixed-size chunks as they are produced."""
         content = document.content
         
         # Split into paragraphs first to avoid breaking sentences
@@ -42,9 +45,7 @@ class FixedChunker:
             # Check if adding paragraph exceeds chunk size
             if len(current_chunk) + len(paragraph) + 2 > self.chunk_size:
                 if current_chunk:
-                    chunks.append(self._create_chunk(
-                        document, current_chunk, chunk_index
-                    ))
+                    yield self._create_chunk(document, current_chunk, chunk_index)
                     chunk_index += 1
                     
                     # Add overlap from previous chunk
@@ -64,9 +65,7 @@ class FixedChunker:
         
         # Add remaining content
         if current_chunk:
-            chunks.append(self._create_chunk(document, current_chunk, chunk_index))
-        
-        return chunks
+            yield self._create_chunk(document, current_chunk, chunk_index)
 
     def _create_chunk(
         self, document: Document, content: str, chunk_index: int
@@ -74,16 +73,17 @@ class FixedChunker:
         """Create a Chunk object."""
         import uuid
         
+        stats = analyze_text(content)
         return Chunk(
             id=str(uuid.uuid4()),
             document_id=document.id,
             content=content,
             metadata=ChunkMetadata(
                 chunk_index=chunk_index,
-                token_count=estimate_tokens(content),
-                char_count=len(content),
-                has_arabic=detect_arabic(content),
-                has_diacritics=detect_diacritics(content),
+                token_count=stats.token_count,
+                char_count=stats.char_count,
+                has_arabic=stats.has_arabic,
+                has_diacritics=stats.has_diacritics,
             ),
         )
 
@@ -97,7 +97,10 @@ class DynamicChunker:
 
     def chunk(self, document: Document) -> List[Chunk]:
         """Split document based on structure (headings, paragraphs, etc.)."""
-        chunks = []
+        return list(self.iter_chunks(document))
+
+    def iter_chunks(self, document: Document) -> Iterator[Chunk]:
+        """Yield structure-based chunks as they are produced."""
         content = document.content
         
         # Parse markdown structure
@@ -122,9 +125,9 @@ class DynamicChunker:
                 if current_section:
                     # Create chunk from accumulated sections
                     chunk_content = '\n\n'.join(current_section)
-                    chunks.append(self._create_chunk(
+                    yield self._create_chunk(
                         document, chunk_content, chunk_index, current_heading
-                    ))
+                    )
                     chunk_index += 1
                     
                     # Start new section
@@ -136,7 +139,7 @@ class DynamicChunker:
                     sub_chunks = self._split_large_section(
                         document, section_content, chunk_index, current_heading
                     )
-                    chunks.extend(sub_chunks)
+                    yield from sub_chunks
                     chunk_index += len(sub_chunks)
                     current_section = []
                     current_size = 0
@@ -147,11 +150,9 @@ class DynamicChunker:
         # Add remaining content
         if current_section:
             chunk_content = '\n\n'.join(current_section)
-            chunks.append(self._create_chunk(
+            yield self._create_chunk(
                 document, chunk_content, chunk_index, current_heading
-            ))
-        
-        return chunks
+            )
 
     def _parse_markdown_structure(self, content: str) -> List[dict]:
         """Parse markdown content into structured sections."""
@@ -243,6 +244,7 @@ class DynamicChunker:
         """Create a Chunk object."""
         import uuid
         
+        stats = analyze_text(content)
         return Chunk(
             id=str(uuid.uuid4()),
             document_id=document.id,
@@ -251,10 +253,10 @@ class DynamicChunker:
                 chunk_index=chunk_index,
                 chunk_type="section",
                 heading=heading,
-                token_count=estimate_tokens(content),
-                char_count=len(content),
-                has_arabic=detect_arabic(content),
-                has_diacritics=detect_diacritics(content),
+                token_count=stats.token_count,
+                char_count=stats.char_count,
+                has_arabic=stats.has_arabic,
+                has_diacritics=stats.has_diacritics,
             ),
         )
 
@@ -302,10 +304,14 @@ class IntelligentChunker:
 
     def chunk(self, document: Document) -> List[Chunk]:
         """Chunk document using the best strategy."""
+        return list(self.iter_chunks(document))
+
+    def iter_chunks(self, document: Document) -> Iterator[Chunk]:
+        """Yield chunks from the best strategy as they are produced."""
         strategy = self.analyze_document(document)
         document.chunking_strategy = strategy
         
         if strategy == ChunkingStrategy.DYNAMIC:
-            return self.dynamic_chunker.chunk(document)
+            return self.dynamic_chunker.iter_chunks(document)
         else:
-            return self.fixed_chunker.chunk(document)
+            return self.fixed_chunker.iter_chunks(document)
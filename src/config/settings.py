@@ -37,8 +37,56 @@ class Settings(BaseSettings):
 
     # Models
     embedding_model: str = "BAAI/bge-m3"
+    embedding_backend: str = Field(
+        default="torch",
+        description="Embedding inference backend: torch or onnx (needs the 'onnx' extra)"
+    )
+    embedding_onnx_file: str = Field(
+        default="",
+        description="ONNX file within the model repo, e.g. onnx/model_qint8_avx512_vnni.onnx for int8; empty uses the default export"
+    )
+    embedding_quantization: str = Field(
+        default="fp32",
+        description="Stored chunk embedding form: fp32, int8 (per-vector scale) or binary (sign bits); quantized forms search a Hamming index over the sign bits"
+    )
+    embedding_disk_cache_dir: str = Field(
+        default="",
+        description="Directory for a persistent .npy embedding cache shared across runs (empty disables)"
+    )
+    embedding_disk_cache_ttl: int = Field(
+        default=0,
+        description="Seconds before persistent embedding cache entries expire (0 = never)"
+    )
+    embedding_cache_dtype: str = Field(
+        default="fp32",
+        description="In-memory embedding cache form: fp32 (exact) or int8 (4x smaller, approximate)"
+    )
     llm_model: str = "gpt-4o"
+    llm_router_model: str = Field(
+        default="auto",
+        description="Model for chunking decisions: 'auto' picks a small model per provider, empty reuses llm_model"
+    )
     chunking_strategy: str = "auto"
+    llm_fastpath_word_threshold: int = Field(
+        default=300,
+        description="Documents below this word count skip the LLM chunking decision"
+    )
+    use_llm_decision: bool = Field(
+        default=True,
+        description="Ask the router LLM when the strategy classifier is missing or not confident (false never calls it)"
+    )
+    strategy_classifier_path: str = Field(
+        default="models/strategy_classifier.joblib",
+        description="Path to the joblib-pickled chunking strategy classifier"
+    )
+    decision_semantic_cache: bool = Field(
+        default=False,
+        description="Reuse LLM chunking decisions for near-duplicate content samples"
+    )
+    decision_semantic_threshold: float = Field(
+        default=0.97,
+        description="Cosine similarity needed to reuse a cached chunking decision"
+    )
 
     # Processing
     max_file_size: int = Field(
@@ -48,6 +96,45 @@ class Settings(BaseSettings):
     chunk_size: int = 512
     chunk_overlap: int = 50
     batch_size: int = 32
+    embedding_max_workers: int = Field(
+        default=1,
+        description="Threads encoding embedding sub-batches in parallel (opt-in; torch already uses intra-op threads, so >1 can oversubscribe CPUs)"
+    )
+    workflow_concurrency: int = Field(
+        default=16,
+        description="Documents processed concurrently by the workflow (LLM-bound steps scale with it)"
+    )
+
+    # Generation
+    max_context_tokens: int = Field(
+        default=3000,
+        description="Token budget for retrieved context in LLM prompts"
+    )
+    max_chunk_tokens: int = Field(
+        default=800,
+        description="Maximum tokens kept from a single context chunk"
+    )
+
+    @field_validator('embedding_quantization')
+    def validate_embedding_quantization(cls, v):
+        """Validate embedding quantization mode."""
+        if v not in ("fp32", "int8", "binary"):
+            raise ValueError("embedding_quantization must be one of fp32, int8, binary")
+        return v
+
+    @field_validator('embedding_backend')
+    def validate_embedding_backend(cls, v):
+        """Validate embedding backend."""
+        if v not in ("torch", "onnx"):
+            raise ValueError("embedding_backend must be torch or onnx")
+        return v
+
+    @field_validator('embedding_cache_dtype')
+    def validate_embedding_cache_dtype(cls, v):
+        """Validate embedding cache dtype."""
+        if v not in ("fp32", "int8"):
+            raise ValueError("embedding_cache_dtype must be fp32 or int8")
+        return v
 
     @field_validator('max_file_size')
     def validate_max_file_size(cls, v):
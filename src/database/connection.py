@@ -12,6 +12,34 @@ from src.config.settings import settings
 
 Base = declarative_base()
 
+# Columns added after the initial schema; create_all() doesn't alter existing tables
+SCHEMA_UPDATES = [
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS content_normalized TEXT",
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_int8 BYTEA",
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_scale DOUBLE PRECISION",
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_bits BYTEA",
+]
+
+# fp16 copy of the JSON embedding for pgvector scans (needs pgvector >= 0.7).
+# Generated, so every write path keeps it in sync without extra code. Rows
+# without a 1024-dim array (quantized, JSON 'null', legacy shapes) get NULL
+# instead of failing the cast, so adding the column never rejects old rows.
+VECTOR_SCHEMA_UPDATES = [
+    "CREATE EXTENSION IF NOT EXISTS vector",
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_half halfvec(1024) "
+    "GENERATED ALWAYS AS (CASE WHEN json_typeof(embedding) = 'array' "
+    "AND json_array_length(embedding) = 1024 "
+    "THEN (embedding::text)::halfvec(1024) END) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_chunks_embedding_half ON chunks "
+    "USING hnsw (embedding_half halfvec_cosine_ops)",
+    # Sign bits of int8/binary-quantized chunks, Hamming-indexed for candidate search
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_bit bit(1024) "
+    "GENERATED ALWAYS AS (CASE WHEN length(embedding_bits) = 128 "
+    "THEN ('x' || encode(embedding_bits, 'hex'))::bit(1024) END) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_chunks_embedding_bit ON chunks "
+    "USING hnsw (embedding_bit bit_hamming_ops)",
+]
+
 
 class DatabaseManager:
     """Manages database connections and sessions."""
@@ -76,6 +104,8 @@ class DatabaseManager:
         except Exception:
             # Ignore table creation errors here; specific calls can handle
             pass
+        # Vector search needs embedding_half and its HNSW index; no-op off PostgreSQL
+        self.upgrade_schema()
 
     async def init_pgvector(self):
         """Initialize pgvector extension."""
@@ -105,6 +135,29 @@ class DatabaseManager:
             )
             Base.metadata.create_all(bind=self.engine)
 
+    def upgrade_schema(self):
+        """
+        Apply schema updates to existing PostgreSQL tables.
+
+        Raises:
+            RuntimeError: If the halfvec column for vector search can't be added
+        """
+        if self.engine is None or self.engine.dialect.name != "postgresql":
+            return
+        with self.engine.begin() as conn:
+            for statement in SCHEMA_UPDATES:
+                conn.execute(text(statement))
+        # Separate transaction so a missing pgvector doesn't undo the updates above
+        try:
+            with self.engine.begin() as conn:
+                for statement in VECTOR_SCHEMA_UPDATES:
+                    conn.execute(text(statement))
+        except Exception as e:
+            raise RuntimeError(
+                "Could not add the embedding_half column required for vector search "
+                f"(pgvector >= 0.7 must be installed): {e}"
+            ) from e
+
     def drop_tables(self):
         """Drop all database tables."""
         Base.metadata.drop_all(bind=self.engine)
@@ -63,6 +63,8 @@ class ChunkModel(Base):
     id = Column(String, primary_key=True)
     document_id = Column(String, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
+    # Search-normalized content, computed at ingest for keyword matching
+    content_normalized = Column(Text, nullable=True)
     
     # Metadata
     chunk_index = Column(Integer, nullable=False)
@@ -74,8 +76,13 @@ class ChunkModel(Base):
     has_arabic = Column(Boolean, default=False)
     has_diacritics = Column(Boolean, default=False)
     
-    # Vector embedding (stored as JSON for compatibility, can be upgraded to pgvector)
-    embedding = Column(JSON, nullable=True)
+    # Vector embedding (stored as JSON for compatibility, can be upgraded to pgvector).
+    # None is SQL NULL, not JSON 'null', so the generated halfvec column stays NULL too
+    embedding = Column(JSON(none_as_null=True), nullable=True)
+    # Quantized embeddings when settings.embedding_quantization is int8 or binary
+    embedding_int8 = Column(LargeBinary, nullable=True)
+    embedding_scale = Column(Float, nullable=True)
+    embedding_bits = Column(LargeBinary, nullable=True)
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -2,10 +2,52 @@
 
 from typing import List, Optional
 from datetime import datetime
+import time
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func, text
 from src.database.models import DocumentModel, ChunkModel
 from src.models.document import Document, Chunk, DocumentMetadata, ChunkMetadata
+from src.utils.text_utils import normalize_for_search
+
+
+# Short-lived cache for document/chunk totals polled by stats endpoints
+STATS_TTL = 5.0
+_STATS_CACHE = {"t": 0.0, "v": None}
+
+# Tables estimated above this size use pg_class statistics instead of COUNT(*)
+APPROXIMATE_COUNT_THRESHOLD = 100_000
+
+
+def _insert_for(session: Session):
+    """Pick the dialect's insert() so ON CONFLICT is available where supported."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        from sqlalchemy import insert as dialect_insert
+    return dialect_insert
+
+
+def get_cached_stats() -> Optional[dict]:
+    """Get cached document stats if they are still fresh."""
+    if _STATS_CACHE["v"] is not None and time.monotonic() - _STATS_CACHE["t"] < STATS_TTL:
+        return dict(_STATS_CACHE["v"])
+    return None
+
+
+def set_cached_stats(stats: dict) -> None:
+    """Store document stats in the cache."""
+    _STATS_CACHE["v"] = dict(stats)
+    _STATS_CACHE["t"] = time.monotonic()
+
+
+def invalidate_stats_cache() -> None:
+    """Force the next stats lookup to hit the database."""
+    _STATS_CACHE["v"] = None
+    _STATS_CACHE["t"] = 0.0
 
 
 class DocumentRepository:
@@ -44,6 +86,7 @@ class DocumentRepository:
             existing.processed_at = document.processed_at
             self.session.commit()
             self.session.refresh(existing)
+            invalidate_stats_cache()
             return existing
 
         doc_model = DocumentModel(
@@ -92,11 +135,13 @@ class DocumentRepository:
                 existing.processed_at = document.processed_at
                 self.session.commit()
                 self.session.refresh(existing)
+                invalidate_stats_cache()
                 return existing
             else:
                 # Re-raise if truly unexpected
                 raise
         self.session.refresh(doc_model)
+        invalidate_stats_cache()
         return doc_model
 
     def get_document(self, document_id: str) -> Optional[DocumentModel]:
@@ -126,6 +171,7 @@ class DocumentRepository:
         if doc:
             self.session.delete(doc)
             self.session.commit()
+            invalidate_stats_cache()
             return True
         return False
 
@@ -141,31 +187,86 @@ class ChunkRepository:
         self.session = session
 
     def create_chunks(self, chunks: List[Chunk]) -> List[ChunkModel]:
-        """Create multiple chunks in the database."""
-        chunk_models = []
-        for chunk in chunks:
-            chunk_model = ChunkModel(
-                id=chunk.id,
-                document_id=chunk.document_id,
-                content=chunk.content,
-                chunk_index=chunk.metadata.chunk_index,
-                page_number=chunk.metadata.page_number,
-                chunk_type=chunk.metadata.chunk_type,
-                heading=chunk.metadata.heading,
-                token_count=chunk.metadata.token_count,
-                char_count=chunk.metadata.char_count,
-                has_arabic=chunk.metadata.has_arabic,
-                has_diacritics=chunk.metadata.has_diacritics,
-                embedding=chunk.embedding,
-            )
-            chunk_models.append(chunk_model)
+        """
+        Create multiple chunks in the database with one batched INSERT.
         
-        self.session.add_all(chunk_models)
+        Chunks whose ID already exists are skipped, so retried ingests are
+        idempotent.
+        
+        Args:
+            chunks: Chunks to store
+        
+        Returns:
+            Stored chunk models (newly inserted rows only)
+        """
+        if not chunks:
+            return []
+        rows = [
+            {
+                "id": chunk.id,
+                "document_id": chunk.document_id,
+                "content": chunk.content,
+                "content_normalized": normalize_for_search(chunk.content),
+                "chunk_index": chunk.metadata.chunk_index,
+                "page_number": chunk.metadata.page_number,
+                "chunk_type": chunk.metadata.chunk_type,
+                "heading": chunk.metadata.heading,
+                "token_count": chunk.metadata.token_count,
+                "char_count": chunk.metadata.char_count,
+                "has_arabic": chunk.metadata.has_arabic,
+                "has_diacritics": chunk.metadata.has_diacritics,
+                # JSON column: ndarray rows become plain lists
+                "embedding": (
+                    chunk.embedding.tolist()
+                    if isinstance(chunk.embedding, np.ndarray)
+                    else chunk.embedding
+                ),
+                "embedding_int8": chunk.embedding_int8,
+                "embedding_scale": chunk.embedding_scale,
+                "embedding_bits": chunk.embedding_bits,
+            }
+            for chunk in chunks
+        ]
+        
+        stmt = _insert_for(self.session)(ChunkModel)
+        if hasattr(stmt, "on_conflict_do_nothing"):
+            stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
+        chunk_models = list(self.session.scalars(stmt.returning(ChunkModel), rows))
         self.session.commit()
-        for cm in chunk_models:
-            self.session.refresh(cm)
+        invalidate_stats_cache()
         return chunk_models
 
+    def backfill_normalized_content(self, batch_size: int = 500, recompute: bool = False) -> int:
+        """
+        Populate content_normalized for chunks stored before the column existed.
+        
+        Args:
+            batch_size: Number of chunks to update per commit
+            recompute: Re-normalize every chunk (after normalization rules change)
+        
+        Returns:
+            Number of chunks updated
+        """
+        updated = 0
+        last_id = None
+        while True:
+            query = self.session.query(ChunkModel)
+            if recompute:
+                # Page by id since updated rows stay eligible
+                if last_id is not None:
+                    query = query.filter(ChunkModel.id > last_id)
+                query = query.order_by(ChunkModel.id)
+            else:
+                query = query.filter(ChunkModel.content_normalized.is_(None))
+            batch = query.limit(batch_size).all()
+            if not batch:
+                return updated
+            for chunk in batch:
+                chunk.content_normalized = normalize_for_search(chunk.content or "")
+            last_id = batch[-1].id
+            self.session.commit()
+            updated += len(batch)
+
     def get_chunks_by_document(self, document_id: Optional[str]) -> List[ChunkModel]:
         """Get all chunks for a document. If document_id is None, return all chunks."""
         query = self.session.query(ChunkModel)
@@ -195,16 +296,16 @@ class ChunkRepository:
             sql = """
             SELECT 
                 c.*,
-                1 - (c.embedding <=> :embedding) as similarity
+                1 - (c.embedding_half <=> CAST(:embedding AS halfvec)) as similarity
             FROM chunks c
-            WHERE c.embedding IS NOT NULL
-            ORDER BY c.embedding <=> :embedding
+            WHERE c.embedding_half IS NOT NULL
+            ORDER BY c.embedding_half <=> CAST(:embedding AS halfvec)
             LIMIT :limit
             """
             
             result = self.session.execute(
                 text(sql),
-                {"embedding": query_embedding, "limit": limit}
+                {"embedding": "[" + ",".join(map(str, query_embedding)) + "]", "limit": limit}
             )
             rows = result.fetchall()
             
@@ -234,9 +335,38 @@ class ChunkRepository:
             logging.warning(f"Vector search failed, returning empty results: {e}")
             return []
 
-    def count_chunks(self, document_id: Optional[str] = None) -> int:
-        """Count total chunks, optionally filtered by document."""
+    def count_chunks(
+        self, document_id: Optional[str] = None, approximate: bool = False
+    ) -> int:
+        """
+        Count total chunks, optionally filtered by document.
+        
+        Args:
+            document_id: Optional document ID to filter by
+            approximate: Use PostgreSQL table statistics for large tables
+        
+        Returns:
+            Number of chunks
+        """
+        if approximate and document_id is None:
+            estimate = self._estimate_row_count(ChunkModel.__tablename__)
+            if estimate is not None and estimate >= APPROXIMATE_COUNT_THRESHOLD:
+                return estimate
+
         query = self.session.query(func.count(ChunkModel.id))
         if document_id:
             query = query.filter(ChunkModel.document_id == document_id)
         return query.scalar()
+
+    def _estimate_row_count(self, table_name: str) -> Optional[int]:
+        """Estimate a table's row count from pg_class (PostgreSQL only)."""
+        if self.session.get_bind().dialect.name != "postgresql":
+            return None
+        estimate = self.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+            {"name": table_name},
+        ).scalar()
+        # reltuples is -1 until the table has been analyzed
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
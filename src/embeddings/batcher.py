@@ -0,0 +1,92 @@
+"""Cross-request embedding batching for concurrent document processing."""
+
+import asyncio
+from typing import List, Optional, Tuple
+
+from src.config.settings import settings
+
+
+class AsyncEmbeddingBatcher:
+    """
+    Coalesce chunk embedding requests from concurrent callers.
+
+    Submissions arriving within a short window are merged, sorted by text
+    length so each model batch pads to similar lengths, embedded in
+    mini-batches, and handed back to each caller in its original order.
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        max_wait_ms: float = 10.0,
+        max_batch_size: int = 1024,
+    ):
+        """
+        Args:
+            embedder: Object with embed_text(texts, batch_size); defaults to
+                the shared embedding generator
+            max_wait_ms: How long to wait for more submissions before dispatch
+            max_batch_size: Maximum texts per dispatch to the embedder
+        """
+        if embedder is None:
+            from src.embeddings.generator import get_embedding_generator
+            embedder = get_embedding_generator()
+        self.embedder = embedder
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def submit(self, chunks: List) -> List[List[float]]:
+        """
+        Embed chunks together with other in-flight submissions.
+
+        Args:
+            chunks: List of Chunk objects
+
+        Returns:
+            Embedding vectors, one per chunk, in input order
+        """
+        if not chunks:
+            return []
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(([chunk.content for chunk in chunks], future))
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_after_wait())
+        return await future
+
+    async def _flush_after_wait(self):
+        """Wait for the coalescing window, then embed everything pending."""
+        await asyncio.sleep(self.max_wait)
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+
+        texts = [text for batch_texts, _ in pending for text in batch_texts]
+        try:
+            embeddings = await asyncio.to_thread(self._embed_sorted, texts)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for batch_texts, future in pending:
+            end = offset + len(batch_texts)
+            if not future.done():
+                future.set_result(embeddings[offset:end])
+            offset = end
+
+    def _embed_sorted(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in length-sorted mini-batches; results keep input order."""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), self.max_batch_size):
+            indices = order[start:start + self.max_batch_size]
+            batch = self.embedder.embed_text(
+                [texts[i] for i in indices], batch_size=settings.batch_size
+            )
+            for i, embedding in zip(indices, batch):
+                embeddings[i] = embedding
+        return embeddings
@@ -0,0 +1,82 @@
+"""On-disk embedding cache shared across processes and runs."""
+
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingDiskCache:
+    """
+    Store embeddings as .npy files keyed by a hash of model id and text.
+
+    Files live under <directory>/<dimension>/<hash[:2]>/<hash>.npy, so
+    models with different vector sizes never share a partition.
+    """
+
+    def __init__(self, directory: str, model_id: str, dimension: int, ttl_seconds: float = 0):
+        """
+        Args:
+            directory: Cache root directory
+            model_id: Identifies the model (and backend) that produced the vectors
+            dimension: Embedding dimension, used as the partition name
+            ttl_seconds: Entries older than this are ignored (0 = never expire)
+        """
+        self.root = Path(directory) / str(dimension)
+        self.model_id = model_id
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, text: str) -> Path:
+        """Cache file for a text."""
+        digest = hashlib.sha256(f"{self.model_id}:{text}".encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.npy"
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Load a cached embedding.
+
+        Args:
+            text: Embedded text
+
+        Returns:
+            float32 vector, or None when missing, expired or unreadable
+        """
+        path = self._path(text)
+        try:
+            if self.ttl_seconds and time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            return np.load(path)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, text: str, embedding: np.ndarray):
+        """
+        Save an embedding; failures are ignored since the cache is best-effort.
+
+        Args:
+            text: Embedded text
+            embedding: float32 vector
+        """
+        path = self._path(text)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see partial files
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, embedding)
+                os.replace(tmp_path, path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning("Could not write embedding cache entry %s: %s", path, e)
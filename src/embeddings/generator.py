@@ -1,10 +1,24 @@
 """Embedding generator using BGE-M3 model."""
 
+import hashlib
+import threading
 import numpy as np
-from typing import List, Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple, Union
 from sentence_transformers import SentenceTransformer
 
 from src.config.settings import settings
+from src.embeddings.disk_cache import EmbeddingDiskCache
+from src.embeddings.quantization import dequantize_int8, quantize_int8
+from src.utils.text_utils import normalize_arabic_text
+
+# Maximum embeddings kept in each generator's content-hash cache
+EMBEDDING_CACHE_SIZE = 4096
+
+# Loaded models shared by all generators, keyed by (model name, backend, ONNX file)
+_MODEL_CACHE: Dict[Tuple[str, str, str], SentenceTransformer] = {}
 
 
 class EmbeddingGenerator:
@@ -15,13 +29,33 @@ class EmbeddingGenerator:
         self.model_name = model_name or settings.embedding_model
         self.model = None
         self._load_model()
+        # Per-instance cache so it is released together with the model
+        self._cache: "OrderedDict[bytes, Union[np.ndarray, Tuple[bytes, float]]]" = OrderedDict()
+        # The shared generator is called from API threads and batcher flushes at once
+        self._cache_lock = threading.Lock()
 
     def _load_model(self):
-        """Load the BGE-M3 model."""
+        """Load the BGE-M3 model (once per process for each model and backend)."""
+        backend = settings.embedding_backend
+        onnx_file = settings.embedding_onnx_file if backend == "onnx" else ""
+        cache_key = (self.model_name, backend, onnx_file)
+        # Vectors differ per backend/export, so persistent caches key on all three
+        self.model_id = ":".join(part for part in cache_key if part)
+        if cache_key in _MODEL_CACHE:
+            self.model = _MODEL_CACHE[cache_key]
+            return
         try:
-            # Use SentenceTransformer directly
-            self.model = SentenceTransformer(self.model_name)
-            print(f"Successfully loaded embedding model: {self.model_name}")
+            if backend == "onnx":
+                # ONNX Runtime; an int8 export uses VNNI dot products on supporting CPUs
+                model_kwargs = {"file_name": onnx_file} if onnx_file else None
+                self.model = SentenceTransformer(
+                    self.model_name, backend="onnx", model_kwargs=model_kwargs
+                )
+            else:
+                # Use SentenceTransformer directly
+                self.model = SentenceTransformer(self.model_name)
+            _MODEL_CACHE[cache_key] = self.model
+            print(f"Successfully loaded embedding model: {self.model_name} ({backend})")
         except Exception as e:
             print(f"Error loading embedding model: {e}")
             raise RuntimeError(
@@ -48,36 +82,169 @@ class EmbeddingGenerator:
 
     def _embed_single(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        embedding = self.model.encode(text)
-        return embedding.tolist()
+        return self._embed_cached([text], batch_size=1)[0].tolist()
 
     def _embed_batch(
         self, texts: List[str], batch_size: int
     ) -> List[List[float]]:
         """Generate embeddings for multiple texts."""
-        embeddings: List[List[float]] = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            result = self.model.encode(batch, show_progress_bar=False)
-            # SentenceTransformer returns a numpy array
-            embeddings.extend(result.tolist())
+        return [embedding.tolist() for embedding in self._embed_cached(texts, batch_size)]
+
+    def _embed_cached(
+        self,
+        texts: List[str],
+        batch_size: int,
+        cache_keys: Optional[List[str]] = None,
+    ) -> List[np.ndarray]:
+        """
+        Embed texts, running the model only on those not already cached.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Batch size for the uncached texts
+            cache_keys: Strings to key the in-memory cache on instead of the
+                texts themselves (the texts are still what gets encoded)
+        
+        Returns:
+            float32 vectors in input order (shared and read-only when cached as fp32)
+        """
+        keys = [
+            hashlib.sha1(key.encode("utf-8")).digest() for key in (cache_keys or texts)
+        ]
+        embeddings: List[np.ndarray] = [None] * len(texts)
+        # Positions of each uncached text; repeats within the call encode once
+        misses: Dict[bytes, List[int]] = {}
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    misses.setdefault(key, []).append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    embeddings[i] = _from_cache_entry(cached)
+
+        if misses and self.disk_cache is not None:
+            for key, positions in list(misses.items()):
+                embedding = self.disk_cache.get(texts[positions[0]])
+                if embedding is not None:
+                    self._remember(key, embedding, positions, embeddings)
+                    del misses[key]
+
+        if misses:
+            miss_texts = [texts[positions[0]] for positions in misses.values()]
+            if self.max_workers > 1 and len(miss_texts) > batch_size:
+                # torch releases the GIL, so sub-batches encode in parallel
+                batches = [
+                    miss_texts[start:start + batch_size]
+                    for start in range(0, len(miss_texts), batch_size)
+                ]
+                result = np.concatenate(list(
+                    self._executor.map(lambda batch: self._encode(batch, batch_size), batches)
+                ))
+            else:
+                # One encode call; the model does its own mini-batching
+                result = self._encode(miss_texts, batch_size)
+            for (key, positions), embedding in zip(misses.items(), result):
+                if self.disk_cache is not None:
+                    self.disk_cache.put(texts[positions[0]], embedding)
+                self._remember(key, embedding, positions, embeddings)
         return embeddings
 
+    def _remember(
+        self,
+        key: bytes,
+        embedding: np.ndarray,
+        positions: List[int],
+        embeddings: List[np.ndarray],
+    ):
+        """Cache a newly obtained embedding and fill it in at each position."""
+        entry = _to_cache_entry(embedding)
+        with self._cache_lock:
+            self._cache[key] = entry
+            while len(self._cache) > EMBEDDING_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        # Misses return the cached form too, so repeat calls agree
+        embedding = _from_cache_entry(entry)
+        for i in positions:
+            embeddings[i] = embedding
+
+    @cached_property
+    def disk_cache(self) -> Optional[EmbeddingDiskCache]:
+        """Persistent cache shared across processes, if configured."""
+        if not settings.embedding_disk_cache_dir:
+            return None
+        return EmbeddingDiskCache(
+            settings.embedding_disk_cache_dir,
+            self.model_id,
+            self.get_embedding_dimension(),
+            ttl_seconds=settings.embedding_disk_cache_ttl,
+        )
+
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Run the model on texts and return a float32 matrix."""
+        result = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            normalize_embeddings=True,
+        )
+        return np.asarray(result, dtype=np.float32)
+
+    @property
+    def max_workers(self) -> int:
+        """Number of threads used to encode sub-batches."""
+        return max(1, settings.embedding_max_workers)
+
+    @cached_property
+    def _executor(self) -> ThreadPoolExecutor:
+        """Thread pool for parallel sub-batch encoding, created on first use."""
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="embed")
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Generate an embedding for a search query, reusing cached vectors.
+        
+        The cache is keyed on the normalized query so diacritic-only variants
+        share a slot, but the original query is what gets encoded, matching
+        how chunk text is embedded.
+        
+        Args:
+            query: Query text
+        
+        Returns:
+            Read-only float32 embedding vector
+        """
+        # Separate key namespace so a query never aliases an embed_text entry
+        cache_key = "query:" + normalize_arabic_text(query)
+        return self._embed_cached([query], batch_size=1, cache_keys=[cache_key])[0]
+
     def embed_chunks(self, chunks: List) -> List:
         """
         Generate embeddings for chunks and update them in-place.
         
+        Chunks are encoded shortest-first to minimise batch padding. Each
+        chunk.embedding is a float32 row of one shared matrix.
+        
         Args:
             chunks: List of Chunk objects
         
         Returns:
             List of updated chunks with embeddings
         """
+        if not chunks:
+            return chunks
+        
         texts = [chunk.content for chunk in chunks]
-        embeddings = self.embed_text(texts, batch_size=settings.batch_size)
+        # Encode in length order so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        # One contiguous float32 matrix; each chunk gets a row view of it
+        matrix = np.stack(self._embed_cached(
+            [texts[i] for i in order], batch_size=settings.batch_size
+        ))
         
-        for chunk, embedding in zip(chunks, embeddings):
-            chunk.embedding = embedding
+        # Undo the sort so embeddings line up with the input chunks
+        for chunk, position in zip(chunks, np.argsort(order)):
+            chunk.embedding = matrix[position]
         
         return chunks
 
@@ -87,6 +254,22 @@ class EmbeddingGenerator:
         return 1024
 
 
+def _to_cache_entry(embedding: np.ndarray) -> Union[np.ndarray, Tuple[bytes, float]]:
+    """Convert a fresh embedding to the configured cache form."""
+    if settings.embedding_cache_dtype == "int8":
+        return quantize_int8(embedding)
+    # Cached vectors are shared between callers
+    embedding.setflags(write=False)
+    return embedding
+
+
+def _from_cache_entry(entry: Union[np.ndarray, Tuple[bytes, float]]) -> np.ndarray:
+    """Recover a float32 vector from a cache entry."""
+    if isinstance(entry, tuple):
+        return dequantize_int8(*entry)
+    return entry
+
+
 # Global embedding generator instance
 embedding_generator = None
 
@@ -0,0 +1,84 @@
+"""Compact int8/binary storage forms for chunk embeddings."""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+
+def quantize_int8(vector: Sequence[float]) -> Tuple[bytes, float]:
+    """
+    Quantize a vector to int8 with a per-vector scale.
+
+    Args:
+        vector: Embedding vector
+
+    Returns:
+        Tuple of (int8 bytes, scale) where vector ≈ int8 * scale
+    """
+    v = np.asarray(vector, dtype=np.float32)
+    scale = float(np.max(np.abs(v))) / 127 if v.size else 0.0
+    if not scale:
+        scale = 1.0
+    q = np.clip(np.round(v / scale), -127, 127).astype(np.int8)
+    return q.tobytes(), scale
+
+
+def dequantize_int8(data: bytes, scale: float) -> np.ndarray:
+    """Recover an approximate float32 vector from int8 bytes and its scale."""
+    return np.frombuffer(data, dtype=np.int8).astype(np.float32) * scale
+
+
+def quantize_binary(vector: Sequence[float]) -> bytes:
+    """Pack the sign bits of a vector (1 for positive components)."""
+    return np.packbits(np.asarray(vector, dtype=np.float32) > 0).tobytes()
+
+
+def binary_literal(vector: Sequence[float]) -> str:
+    """Sign bits of a vector as a pgvector bit string, e.g. '1010'."""
+    return "".join("1" if x > 0 else "0" for x in np.asarray(vector, dtype=np.float32))
+
+
+def quantize_chunks(chunks: List, mode: str = None) -> List:
+    """
+    Replace chunk embeddings with their compact storage form in place.
+
+    Args:
+        chunks: List of Chunk objects with fp32 embeddings
+        mode: "fp32" (no-op), "int8" or "binary" (default: settings.embedding_quantization)
+
+    Returns:
+        The same chunks
+    """
+    mode = mode or settings.embedding_quantization
+    if mode == "fp32":
+        return chunks
+    for chunk in chunks:
+        if chunk.embedding is None:
+            continue
+        if mode == "int8":
+            chunk.embedding_int8, chunk.embedding_scale = quantize_int8(chunk.embedding)
+        # Sign bits back the Hamming index in both modes; int8 rescores its candidates
+        chunk.embedding_bits = quantize_binary(chunk.embedding)
+        chunk.embedding = None
+    return chunks
+
+
+def int8_similarities(
+    query: np.ndarray, rows: Sequence[Tuple[bytes, float]]
+) -> np.ndarray:
+    """Cosine similarity between a query and int8-quantized vectors."""
+    matrix = np.stack([dequantize_int8(data, scale) for data, scale in rows])
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+    norms[norms == 0] = 1.0
+    return (matrix @ np.asarray(query, dtype=np.float32)) / norms
+
+
+def binary_similarities(query: np.ndarray, rows: Sequence[bytes]) -> np.ndarray:
+    """Fraction of matching sign bits between a query and binary vectors."""
+    query_bits = np.unpackbits(np.frombuffer(quantize_binary(query), dtype=np.uint8))
+    matrix = np.unpackbits(
+        np.stack([np.frombuffer(data, dtype=np.uint8) for data in rows]), axis=1
+    )[:, :query_bits.size]
+    return (matrix == query_bits).mean(axis=1)
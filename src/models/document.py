@@ -2,8 +2,9 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ChunkingStrategy(str, Enum):
@@ -49,11 +50,18 @@ class ChunkMetadata(BaseModel):
 
 class Chunk(BaseModel):
     """Document chunk."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
     id: str
     document_id: str
     content: str
     metadata: ChunkMetadata
-    embedding: Optional[List[float]] = None
+    # float32 row (a view into the batch matrix) when freshly embedded, list when loaded
+    embedding: Optional[Union[np.ndarray, List[float]]] = None
+    # Compact storage forms (see settings.embedding_quantization)
+    embedding_int8: Optional[bytes] = None
+    embedding_scale: Optional[float] = None
+    embedding_bits: Optional[bytes] = None
 
 
 class Document(BaseModel):
@@ -65,6 +73,8 @@ class Document(BaseModel):
     metadata: DocumentMetadata
     chunks: List[Chunk] = []
     chunking_strategy: ChunkingStrategy = ChunkingStrategy.AUTO
+    # Features computed by the processing workflow's analysis step
+    analysis: Dict[str, Any] = {}
     created_at: datetime = Field(default_factory=datetime.utcnow)
     processed_at: Optional[datetime] = None
 
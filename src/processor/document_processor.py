@@ -1,6 +1,7 @@
 """Main document processor that integrates all components."""
 
 import time
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -11,6 +12,7 @@ from src.models.document import Document, ProcessingResult
 from src.parsers.docling_parser import DoclingParser
 from src.chunking.strategies import IntelligentChunker, FixedChunker, DynamicChunker
 from src.embeddings.generator import get_embedding_generator
+from src.embeddings.quantization import quantize_chunks
 from src.arabic.processor import get_arabic_processor
 from src.database.connection import db_manager
 from src.database.repository import DocumentRepository, ChunkRepository
@@ -37,16 +39,22 @@ class DocumentProcessor:
             dynamic_chunker=self.dynamic_chunker,
         )
         
-        # Initialize embedding generator
-        self.embedding_generator = get_embedding_generator()
-        
-        # Initialize Arabic processor
-        self.arabic_processor = get_arabic_processor()
-        
         # Initialize repositories
         self.document_repo = DocumentRepository(session)
         self.chunk_repo = ChunkRepository(session)
 
+    # Model-backed components load on first use, so runs that never embed skip the cost
+
+    @cached_property
+    def embedding_generator(self):
+        """Shared embedding generator."""
+        return get_embedding_generator()
+
+    @cached_property
+    def arabic_processor(self):
+        """Shared Arabic processor."""
+        return get_arabic_processor()
+
     def process_file(
         self,
         file_path: str,
@@ -81,7 +89,7 @@ class DocumentProcessor:
             
             # Generate embeddings for chunks
             if document.chunks:
-                self.embedding_generator.embed_chunks(document.chunks)
+                self._embed_chunks(document.chunks)
             
             # Store in database
             self.document_repo.create_document(document)
@@ -142,7 +150,7 @@ class DocumentProcessor:
             
             # Generate embeddings for chunks
             if document.chunks:
-                self.embedding_generator.embed_chunks(document.chunks)
+                self._embed_chunks(document.chunks)
             
             # Store in database
             self.document_repo.create_document(document)
@@ -167,6 +175,13 @@ class DocumentProcessor:
                 chunks_created=0,
             )
 
+    def _embed_chunks(self, chunks):
+        """Embed chunks and keep the configured storage form."""
+        # embed_chunks length-sorts its batches itself
+        self.embedding_generator.embed_chunks(chunks)
+        # Keep only the configured storage form
+        quantize_chunks(chunks)
+
     def get_document(self, document_id: str) -> Optional[Document]:
         """Get a processed document by ID."""
         doc_model = self.document_repo.get_document(document_id)
@@ -195,6 +210,9 @@ class DocumentProcessor:
                     has_diacritics=cm.has_diacritics,
                 ),
                 embedding=cm.embedding,
+                embedding_int8=cm.embedding_int8,
+                embedding_scale=cm.embedding_scale,
+                embedding_bits=cm.embedding_bits,
             )
             for cm in chunk_models
         ]
@@ -1,10 +1,35 @@
 """Answer generation using LLMs."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from openai import OpenAI
 from anthropic import Anthropic
 
 from src.config.settings import settings
+from src.utils.text_utils import estimate_tokens, get_token_encoder
+
+
+# Prompt skeletons are built once; only context and query are filled in per call
+_CONTEXT_HEADER = "Context {i}:\n"
+_PROMPT_TEMPLATE = """You are a helpful assistant that answers questions based on the provided context.
+
+Context:
+{context}
+
+Question: {query}
+
+Please provide a comprehensive answer based on the context above. If the context doesn't contain enough information, say so.
+"""
+
+_ARABIC_CONTEXT_HEADER = "السياق {i}:\n"
+_ARABIC_PROMPT_TEMPLATE = """أنت مساعد مفيد يجيب على الأسئلة بناءً على السياق المقدم.
+
+السياق:
+{context}
+
+السؤال: {query}
+
+يرجى تقديم إجابة شاملة بناءً على السياق أعلاه. إذا لم يكن السياق يحتوي على معلومات كافية، قل ذلك.
+"""
 
 
 class AnswerGenerator:
@@ -50,19 +75,8 @@ class AnswerGenerator:
             joined = "\n\n".join(context_texts)[:800]
             return joined if joined else "No relevant information found."
 
-        # Format context
-        context_text = "\n\n".join([f"Context {i+1}:\n{c}" for i, c in enumerate(context)])
-        
         # Build prompt
-        prompt = f"""You are a helpful assistant that answers questions based on the provided context.
-
-Context:
-{context_text}
-
-Question: {query}
-
-Please provide a comprehensive answer based on the context above. If the context doesn't contain enough information, say so.
-"""
+        prompt = self._build_prompt(query, context, model)
         
         # Generate answer based on model
         if model.startswith("gpt"):
@@ -86,6 +100,131 @@ Please provide a comprehensive answer based on the context above. If the context
             joined = "\n\n".join(context_texts)[:800]
             return joined if joined else "No relevant information found."
 
+    def stream_answer(
+        self,
+        query: str,
+        context: List[str],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        language: str = "en",
+    ) -> Iterator[str]:
+        """
+        Stream an answer token by token as the LLM produces it.
+        
+        Args:
+            query: User question
+            context: Relevant context chunks
+            model: Model to use (gpt-4o, claude-3-5-sonnet, etc.)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            language: 'ar' for an Arabic answer, otherwise English
+        
+        Yields:
+            Answer text fragments
+        """
+        model = model or settings.llm_model
+        if language == "ar":
+            empty_message = "لم يتم العثور على معلومات ذات صلة."
+            build_prompt = self._build_arabic_prompt
+        else:
+            empty_message = "No relevant information found."
+            build_prompt = self._build_prompt
+
+        if model.startswith("gpt") and self.openai_client:
+            stream = self._stream_openai
+        elif model.startswith("claude") and self.anthropic_client:
+            stream = self._stream_anthropic
+        else:
+            yield self._extractive_answer(context, empty_message)
+            return
+
+        prompt = build_prompt(query, context, model)
+        started = False
+        try:
+            for delta in stream(prompt, model, temperature, max_tokens):
+                if delta:
+                    started = True
+                    yield delta
+        except Exception:
+            # Tokens already sent can't be taken back; only fall back before the first one
+            if not started:
+                yield self._extractive_answer(context, empty_message)
+
+    def _extractive_answer(self, context: List[str], empty_message: str) -> str:
+        """Build a simple extractive answer when no LLM is available."""
+        context_texts = [c for c in context if c]
+        joined = "\n\n".join(context_texts)[:800]
+        return joined if joined else empty_message
+
+    def _build_prompt(self, query: str, context: List[str], model: str) -> str:
+        """Build the English answer prompt."""
+        # Format context within the token budget
+        context_text = self._pack_context(
+            context, settings.max_context_tokens, model, header=_CONTEXT_HEADER
+        )
+        return _PROMPT_TEMPLATE.format(context=context_text, query=query)
+
+    def _build_arabic_prompt(self, query: str, context: List[str], model: str) -> str:
+        """Build the Arabic answer prompt."""
+        # Format context within the token budget
+        context_text = self._pack_context(
+            context, settings.max_context_tokens, model, header=_ARABIC_CONTEXT_HEADER
+        )
+        return _ARABIC_PROMPT_TEMPLATE.format(context=context_text, query=query)
+
+    def _pack_context(
+        self,
+        chunks: List[str],
+        budget_tokens: int,
+        model: str,
+        header: str = _CONTEXT_HEADER,
+    ) -> str:
+        """
+        Pack ranked context chunks into a prompt section within a token budget.
+        
+        Chunks are taken in rank order and each one is trimmed to
+        settings.max_chunk_tokens; packing stops once the budget is spent.
+        Token counts fall back to estimate_tokens when tiktoken is unavailable.
+        
+        Args:
+            chunks: Context chunks, best first
+            budget_tokens: Total token budget for all chunks
+            model: Model used to pick the tokenizer
+            header: Per-chunk header template with an {i} placeholder
+        
+        Returns:
+            Formatted context text
+        """
+        encoder = get_token_encoder(model)
+        parts = []
+        remaining = budget_tokens
+
+        for i, chunk in enumerate(chunks, 1):
+            limit = min(settings.max_chunk_tokens, remaining)
+            if limit <= 0:
+                break
+
+            if encoder is not None:
+                tokens = encoder.encode(chunk)
+                if len(tokens) > limit:
+                    tokens = tokens[:limit]
+                    chunk = encoder.decode(tokens)
+                used = len(tokens)
+            else:
+                used = estimate_tokens(chunk)
+                if used > limit:
+                    chunk = chunk[:len(chunk) * limit // used]
+                    used = limit
+
+            if parts:
+                parts.append("\n\n")
+            parts.append(header.format(i=i))
+            parts.append(chunk)
+            remaining -= used
+
+        return "".join(parts)
+
     def _generate_openai(
         self, prompt: str, model: str, temperature: float, max_tokens: int
     ) -> str:
@@ -122,6 +261,45 @@ Please provide a comprehensive answer based on the context above. If the context
         
         return response.content[0].text
 
+    def _stream_openai(
+        self, prompt: str, model: str, temperature: float, max_tokens: int
+    ) -> Iterator[str]:
+        """Stream answer tokens from OpenAI."""
+        if not self.openai_client:
+            raise ValueError("OpenAI API key not configured")
+        
+        stream = self.openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "user", "content": prompt},
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        
+        for event in stream:
+            if event.choices:
+                yield event.choices[0].delta.content or ""
+
+    def _stream_anthropic(
+        self, prompt: str, model: str, temperature: float, max_tokens: int
+    ) -> Iterator[str]:
+        """Stream answer tokens from Anthropic."""
+        if not self.anthropic_client:
+            raise ValueError("Anthropic API key not configured")
+        
+        with self.anthropic_client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[
+                {"role": "user", "content": prompt},
+            ],
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+
     def generate_arabic_answer(
         self,
         query: str,
@@ -147,19 +325,8 @@ Please provide a comprehensive answer based on the context above. If the context
             joined = "\n\n".join(context_texts)[:800]
             return joined if joined else "لم يتم العثور على معلومات ذات صلة."
 
-        # Format context
-        context_text = "\n\n".join([f"السياق {i+1}:\n{c}" for i, c in enumerate(context)])
-        
         # Build Arabic prompt
-        prompt = f"""أنت مساعد مفيد يجيب على الأسئلة بناءً على السياق المقدم.
-
-السياق:
-{context_text}
-
-السؤال: {query}
-
-يرجى تقديم إجابة شاملة بناءً على السياق أعلاه. إذا لم يكن السياق يحتوي على معلومات كافية، قل ذلك.
-"""
+        prompt = self._build_arabic_prompt(query, context, model)
         
         # Generate answer
         if model.startswith("gpt"):
@@ -1,11 +1,17 @@
 """RAG pipeline combining retrieval and generation."""
 
-from typing import List, Optional, Dict, Any
+import asyncio
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from sqlalchemy.orm import Session
 
 from src.rag.retriever import Retriever
 from src.rag.generator import get_answer_generator
-from src.database.repository import DocumentRepository, ChunkRepository
+from src.database.repository import (
+    DocumentRepository,
+    ChunkRepository,
+    get_cached_stats,
+    set_cached_stats,
+)
 
 
 class RAGPipeline:
@@ -44,6 +50,43 @@ class RAGPipeline:
             document_id=document_id,
         )
         
+        return self._answer(question, chunks, model)
+
+    async def aquery(
+        self,
+        question: str,
+        top_k: int = 5,
+        document_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process a question from async code, running vector and keyword search concurrently.
+        
+        Args:
+            question: User question
+            top_k: Number of chunks to retrieve
+            document_id: Optional document ID to search within
+            model: LLM model to use
+        
+        Returns:
+            Dictionary with answer and retrieved context
+        """
+        chunks = await self.retriever.aretrieve(
+            query=question,
+            top_k=top_k,
+            document_id=document_id,
+        )
+        
+        # Answer generation is a blocking HTTP call; keep it off the event loop
+        return await asyncio.to_thread(self._answer, question, chunks, model)
+
+    def _answer(
+        self,
+        question: str,
+        chunks: List[Any],
+        model: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Generate an answer from retrieved chunks."""
         if not chunks:
             return {
                 "answer": "No relevant information found.",
@@ -133,12 +176,75 @@ class RAGPipeline:
             "sources": sources,
         }
 
+    def stream_query(
+        self,
+        question: str,
+        top_k: int = 5,
+        document_id: Optional[str] = None,
+        model: Optional[str] = None,
+        language: str = "en",
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Process a question and stream the answer as it is generated.
+        
+        Args:
+            question: User question
+            top_k: Number of chunks to retrieve
+            document_id: Optional document ID to search within
+            model: LLM model to use
+            language: 'ar' for an Arabic answer, otherwise English
+        
+        Yields:
+            ("context", sources) once, then ("delta", text) per answer fragment
+        """
+        # Retrieve relevant chunks
+        chunks = self.retriever.retrieve(
+            query=question,
+            top_k=top_k,
+            document_id=document_id,
+            filters={"has_arabic": True} if language == "ar" else None,
+        )
+        
+        sources = [
+            {
+                "chunk_id": chunk.id,
+                "document_id": chunk.document_id,
+                "content": chunk.content[:200] + "...",
+            }
+            for chunk in chunks
+        ]
+        yield ("context", sources)
+        
+        if not chunks:
+            empty_message = (
+                "لم يتم العثور على معلومات ذات صلة."
+                if language == "ar"
+                else "No relevant information found."
+            )
+            yield ("delta", empty_message)
+            return
+        
+        context = [chunk.content for chunk in chunks]
+        for delta in self.answer_generator.stream_answer(
+            query=question,
+            context=context,
+            model=model,
+            language=language,
+        ):
+            yield ("delta", delta)
+
     def get_document_stats(self) -> Dict[str, Any]:
-        """Get statistics about indexed documents."""
+        """Get statistics about indexed documents (cached for a few seconds)."""
+        cached = get_cached_stats()
+        if cached is not None:
+            return cached
+
         total_documents = self.document_repo.count_documents()
-        total_chunks = self.chunk_repo.count_chunks()
+        total_chunks = self.chunk_repo.count_chunks(approximate=True)
         
-        return {
+        stats = {
             "total_documents": total_documents,
             "total_chunks": total_chunks,
         }
+        set_cached_stats(stats)
+        return stats
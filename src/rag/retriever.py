@@ -1,14 +1,214 @@
 """Retrieval system for RAG."""
 
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+import asyncio
+from typing import List, Optional, Dict, Any, Tuple
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import select, text
 import numpy as np
-import re
 
+from src.config.settings import settings
+from src.database.connection import db_manager
 from src.database.models import ChunkModel
 from src.embeddings.generator import get_embedding_generator
-from src.utils.text_utils import remove_diacritics
+from src.embeddings.quantization import binary_literal, binary_similarities, int8_similarities
+from src.utils.text_utils import normalize_for_search
+
+# Candidates fetched from the halfvec scan per requested result
+RERANK_FACTOR = 4
+
+# Embedding columns that candidate and result queries never need
+_DEFER_EMBEDDINGS = (
+    defer(ChunkModel.embedding),
+    defer(ChunkModel.embedding_int8),
+    defer(ChunkModel.embedding_bits),
+)
+
+
+def _vector_search_sql(
+    query_embedding: np.ndarray,
+    top_k: int,
+    document_id: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the pgvector similarity query and its parameters.
+    
+    Scans the fp16 embedding_half column for top_k * RERANK_FACTOR candidates,
+    then re-ranks them with fp32 distances (parsed from the JSON embedding,
+    so that per-row cost is bounded by the candidate pool).
+    
+    Args:
+        query_embedding: Query vector
+        top_k: Number of results to return
+        document_id: Optional document ID to filter by
+        filters: Optional filters (chunk_type, has_arabic)
+    
+    Returns:
+        Tuple of (SQL text, bind parameters)
+    """
+    sql = f"""
+    SELECT 
+        c.id, c.document_id, c.content, c.chunk_index, c.page_number,
+        c.chunk_type, c.heading, c.token_count, c.char_count,
+        c.has_arabic, c.has_diacritics, c.created_at,
+        (c.embedding::text)::vector <=> CAST(:embedding AS vector) as distance
+    FROM chunks c
+    WHERE c.embedding_half IS NOT NULL
+    """
+    
+    # pgvector text format, accepted by both psycopg2 and asyncpg
+    params = {"embedding": "[" + ",".join(map(str, np.asarray(query_embedding).tolist())) + "]"}
+    
+    # Add document filter
+    if document_id:
+        sql += " AND c.document_id = :document_id"
+        params["document_id"] = document_id
+    
+    # Add additional filters
+    if filters:
+        if "chunk_type" in filters:
+            sql += " AND c.chunk_type = :chunk_type"
+            params["chunk_type"] = filters["chunk_type"]
+        if "has_arabic" in filters:
+            sql += " AND c.has_arabic = :has_arabic"
+            params["has_arabic"] = filters["has_arabic"]
+    
+    # Coarse scan over halfvec, limited to the rerank pool
+    sql += f" ORDER BY c.embedding_half <=> CAST(:embedding AS halfvec) LIMIT {int(top_k) * RERANK_FACTOR}"
+    
+    # Fine re-rank of the pool with fp32 distances
+    sql = f"SELECT * FROM ({sql}) candidates ORDER BY distance LIMIT {int(top_k)}"
+    
+    return sql, params
+
+
+def _rows_to_chunks(rows) -> List[ChunkModel]:
+    """Convert vector search rows to ChunkModel objects (without embeddings)."""
+    return [
+        ChunkModel(
+            id=row.id,
+            document_id=row.document_id,
+            content=row.content,
+            chunk_index=row.chunk_index,
+            page_number=row.page_number,
+            chunk_type=row.chunk_type,
+            heading=row.heading,
+            token_count=row.token_count,
+            char_count=row.char_count,
+            has_arabic=row.has_arabic,
+            has_diacritics=row.has_diacritics,
+            created_at=row.created_at,
+        )
+        for row in rows
+    ]
+
+
+def _keyword_candidates_stmt(
+    document_id: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+):
+    """Build the candidate query for keyword search."""
+    # Skip loading the large embedding columns for candidates
+    stmt = select(ChunkModel).options(*_DEFER_EMBEDDINGS)
+    return _apply_filters(stmt, document_id, filters)
+
+
+def _apply_filters(
+    stmt,
+    document_id: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+):
+    """Apply the document and metadata filters to a chunk query."""
+    if document_id:
+        stmt = stmt.where(ChunkModel.document_id == document_id)
+    if filters:
+        if "chunk_type" in filters:
+            stmt = stmt.where(ChunkModel.chunk_type == filters["chunk_type"])
+        if "has_arabic" in filters:
+            stmt = stmt.where(ChunkModel.has_arabic == filters["has_arabic"])
+    return stmt
+
+
+def _quantized_candidates_stmt(
+    query_embedding: np.ndarray,
+    top_k: int,
+    dialect: str,
+    document_id: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+):
+    """
+    Select candidate chunk IDs with their quantized embeddings for rescoring.
+    
+    On PostgreSQL the embedding_bit Hamming index yields the nearest
+    top_k * RERANK_FACTOR chunks; the SQLite fallback scans every row.
+    
+    Args:
+        query_embedding: Query vector
+        top_k: Number of results to return
+        dialect: Database dialect name of the session
+        document_id: Optional document ID to filter by
+        filters: Optional filters (chunk_type, has_arabic)
+    
+    Returns:
+        Select statement over (id, quantized embedding columns)
+    """
+    if settings.embedding_quantization == "int8":
+        stmt = select(
+            ChunkModel.id, ChunkModel.embedding_int8, ChunkModel.embedding_scale
+        ).where(ChunkModel.embedding_int8.isnot(None))
+    else:
+        stmt = select(ChunkModel.id, ChunkModel.embedding_bits).where(
+            ChunkModel.embedding_bits.isnot(None)
+        )
+    stmt = _apply_filters(stmt, document_id, filters)
+    if dialect == "postgresql":
+        distance = text("chunks.embedding_bit <~> CAST(:query_bits AS bit(1024))").bindparams(
+            query_bits=binary_literal(query_embedding)
+        )
+        stmt = stmt.order_by(distance).limit(int(top_k) * RERANK_FACTOR)
+    return stmt
+
+
+def _rank_quantized(rows, query_embedding: np.ndarray, top_k: int) -> List[str]:
+    """Rank quantized candidates against the fp32 query; returns chunk IDs, best first."""
+    if not rows:
+        return []
+    if settings.embedding_quantization == "int8":
+        scores = int8_similarities(query_embedding, [(r[1], r[2]) for r in rows])
+    else:
+        scores = binary_similarities(query_embedding, [r[1] for r in rows])
+    best = np.argsort(-scores, kind="stable")[:top_k]
+    return [rows[i][0] for i in best]
+
+
+def _chunks_by_ids_stmt(ids: List[str]):
+    """Load chunks by ID (order is restored by the caller)."""
+    return select(ChunkModel).options(*_DEFER_EMBEDDINGS).where(ChunkModel.id.in_(ids))
+
+
+def _in_id_order(chunks: List[ChunkModel], ids: List[str]) -> List[ChunkModel]:
+    """Order chunks to match a ranked ID list."""
+    by_id = {c.id: c for c in chunks}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _rank_by_keywords(
+    candidates: List[ChunkModel], query: str, top_k: int
+) -> List[ChunkModel]:
+    """Rank candidates by keyword occurrences (diacritic-insensitive, dialect-agnostic)."""
+    # Extract keywords from query, normalized once rather than per candidate
+    keywords = [k for k in query.lower().split() if k]
+    norm_keywords = tuple(nk for nk in (normalize_for_search(k) for k in keywords) if nk)
+
+    def score_chunk(c: ChunkModel) -> int:
+        norm = c.content_normalized
+        if norm is None:
+            # Rows stored before content_normalized existed
+            norm = normalize_for_search(c.content or "")
+        return sum(norm.count(k) for k in norm_keywords)
+
+    ranked = sorted(candidates, key=score_chunk, reverse=True)
+    return ranked[:top_k]
 
 
 class VectorRetriever:
@@ -25,6 +225,7 @@ class VectorRetriever:
         top_k: int = 5,
         document_id: Optional[str] = None,
         filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> List[ChunkModel]:
         """
         Retrieve relevant chunks using vector similarity search.
@@ -34,40 +235,26 @@ class VectorRetriever:
             top_k: Number of results to return
             document_id: Optional document ID to filter by
             filters: Optional filters (e.g., chunk_type, has_arabic)
+            query_embedding: Precomputed query embedding (computed if omitted)
         
         Returns:
             List of relevant chunks
         """
         # Generate query embedding
-        query_embedding = self.embedding_generator.embed_text(query)
+        if query_embedding is None:
+            query_embedding = self.embedding_generator.embed_query(query)
         
-        # Build SQL query with vector similarity
-        sql = f"""
-        SELECT 
-            c.*,
-            c.embedding <=> :embedding as distance
-        FROM chunks c
-        WHERE c.embedding IS NOT NULL
-        """
-        
-        params = {"embedding": query_embedding}
-        
-        # Add document filter
-        if document_id:
-            sql += " AND c.document_id = :document_id"
-            params["document_id"] = document_id
-        
-        # Add additional filters
-        if filters:
-            if "chunk_type" in filters:
-                sql += " AND c.chunk_type = :chunk_type"
-                params["chunk_type"] = filters["chunk_type"]
-            if "has_arabic" in filters:
-                sql += " AND c.has_arabic = :has_arabic"
-                params["has_arabic"] = filters["has_arabic"]
+        # Quantized embeddings: Hamming-index candidates, rescored in process
+        if settings.embedding_quantization != "fp32":
+            stmt = _quantized_candidates_stmt(
+                query_embedding, top_k, self.session.get_bind().dialect.name, document_id, filters
+            )
+            rows = self.session.execute(stmt).all()
+            ids = _rank_quantized(rows, query_embedding, top_k)
+            return _in_id_order(self.session.scalars(_chunks_by_ids_stmt(ids)).all(), ids)
         
-        # Order by distance and limit
-        sql += f" ORDER BY distance LIMIT {top_k}"
+        # Build SQL query with vector similarity
+        sql, params = _vector_search_sql(query_embedding, top_k, document_id, filters)
         
         # Execute query with safe fallback if pgvector isn't available
         try:
@@ -76,29 +263,10 @@ class VectorRetriever:
         except Exception as e:
             # Likely pgvector or operator not available (e.g., embedding column not vector type)
             # Return empty list so caller can fall back to keyword search/hybrid.
+            self.session.rollback()
             return []
         
-        # Convert to ChunkModel objects
-        chunks = []
-        for row in rows:
-            chunk = ChunkModel(
-                id=row.id,
-                document_id=row.document_id,
-                content=row.content,
-                chunk_index=row.chunk_index,
-                page_number=row.page_number,
-                chunk_type=row.chunk_type,
-                heading=row.heading,
-                token_count=row.token_count,
-                char_count=row.char_count,
-                has_arabic=row.has_arabic,
-                has_diacritics=row.has_diacritics,
-                embedding=row.embedding,
-                created_at=row.created_at,
-            )
-            chunks.append(chunk)
-        
-        return chunks
+        return _rows_to_chunks(rows)
 
     def hybrid_retrieve(
         self,
@@ -123,12 +291,16 @@ class VectorRetriever:
         Returns:
             List of relevant chunks
         """
+        # Embed the query once for every stage of this request
+        query_embedding = self.embedding_generator.embed_query(query)
+
         # Vector search
         vector_results = self.retrieve(
             query=query,
             top_k=top_k * 2,
             document_id=document_id,
             filters=filters,
+            query_embedding=query_embedding,
         )
         
         # Keyword search (simple text matching)
@@ -145,9 +317,10 @@ class VectorRetriever:
             keyword_results=keyword_results,
             vector_weight=vector_weight,
             keyword_weight=keyword_weight,
+            top_k=top_k,
         )
         
-        return combined[:top_k]
+        return combined
 
     def _keyword_search(
         self,
@@ -157,32 +330,10 @@ class VectorRetriever:
         filters: Optional[Dict[str, Any]] = None,
     ) -> List[ChunkModel]:
         """Simple keyword-based search."""
-        # Extract keywords from query
-        keywords = [k for k in query.lower().split() if k]
-
-        # Fetch candidates and score in Python (diacritic-insensitive, dialect-agnostic)
-        q = self.session.query(ChunkModel)
-        if document_id:
-            q = q.filter(ChunkModel.document_id == document_id)
-        if filters:
-            if "chunk_type" in filters:
-                q = q.filter(ChunkModel.chunk_type == filters["chunk_type"])
-            if "has_arabic" in filters:
-                q = q.filter(ChunkModel.has_arabic == filters["has_arabic"])
-        candidates: List[ChunkModel] = q.all()
-
-        def score_chunk(c: ChunkModel) -> int:
-            raw = (c.content or "")
-            norm = remove_diacritics(raw)
-            norm = re.sub(r"[^\w\s]", " ", norm, flags=re.UNICODE)
-            norm = norm.lower()
-            nk = [re.sub(r"[^\w\s]", " ", remove_diacritics(k)).lower() for k in keywords]
-            return sum(norm.count(k) for k in nk if k)
-
-        ranked = sorted(candidates, key=score_chunk, reverse=True)
-        return ranked[:top_k]
-
-        # (Unreachable legacy SQL path removed for portability)
+        # Fetch candidates and score in Python
+        stmt = _keyword_candidates_stmt(document_id, filters)
+        candidates: List[ChunkModel] = self.session.scalars(stmt).all()
+        return _rank_by_keywords(candidates, query, top_k)
 
     def _combine_results(
         self,
@@ -190,29 +341,177 @@ class VectorRetriever:
         keyword_results: List[ChunkModel],
         vector_weight: float,
         keyword_weight: float,
+        top_k: Optional[int] = None,
     ) -> List[ChunkModel]:
         """Combine vector and keyword search results."""
-        scores = {}
-        
-        # Score vector results
-        for i, chunk in enumerate(vector_results):
-            score = (len(vector_results) - i) / len(vector_results)  # Higher rank = higher score
-            scores[chunk.id] = scores.get(chunk.id, 0) + score * vector_weight
-        
-        # Score keyword results
-        for i, chunk in enumerate(keyword_results):
-            score = (len(keyword_results) - i) / len(keyword_results)
-            scores[chunk.id] = scores.get(chunk.id, 0) + score * keyword_weight
-        
-        # Combine and sort
-        all_chunks = {c.id: c for c in vector_results + keyword_results}
-        sorted_chunks = sorted(
-            all_chunks.values(),
-            key=lambda c: scores.get(c.id, 0),
-            reverse=True,
+        candidates = vector_results + keyword_results
+        if not candidates or (top_k is not None and top_k <= 0):
+            return []
+
+        n_vector = len(vector_results)
+        n_keyword = len(keyword_results)
+
+        # Dedupe chunk IDs; rank unique IDs by first appearance so ties keep
+        # vector results ahead of keyword-only results
+        ids = np.array([c.id for c in candidates])
+        _, first_index, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        appearance = np.argsort(first_index)
+        rank = np.empty_like(appearance)
+        rank[appearance] = np.arange(len(appearance))
+        inverse = rank[inverse]
+        first_index = first_index[appearance]
+
+        # Higher rank = higher score, weighted per source
+        scores = np.zeros(len(first_index), dtype=np.float64)
+        if n_vector:
+            np.add.at(
+                scores,
+                inverse[:n_vector],
+                (n_vector - np.arange(n_vector)) / n_vector * vector_weight,
+            )
+        if n_keyword:
+            np.add.at(
+                scores,
+                inverse[n_vector:],
+                (n_keyword - np.arange(n_keyword)) / n_keyword * keyword_weight,
+            )
+
+        # Select top-k without a full sort, then order the selection
+        if top_k is not None and top_k < len(scores):
+            kth = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+            # argpartition breaks ties arbitrarily; keep the earliest ones at the cut
+            above = np.flatnonzero(scores > kth)
+            tied = np.flatnonzero(scores == kth)[:max(0, top_k - len(above))]
+            idx = np.concatenate((above, tied))
+        else:
+            idx = np.arange(len(scores))
+        idx = idx[np.lexsort((idx, -scores[idx]))]
+
+        return [candidates[first_index[i]] for i in idx]
+
+
+class AsyncVectorRetriever(VectorRetriever):
+    """
+    Vector retrieval running vector and keyword search concurrently on asyncpg.
+
+    For async callers only: await `aretrieve` / `ahybrid_retrieve` from a
+    running event loop. Sync code should use `VectorRetriever(session)`.
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or db_manager.AsyncSessionLocal
+        if self.session_factory is None:
+            raise RuntimeError("Async database session is not available")
+        self.session = None
+        self.embedding_generator = get_embedding_generator()
+        self.embedding_dim = self.embedding_generator.get_embedding_dimension()
+
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        document_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[ChunkModel]:
+        """
+        Retrieve relevant chunks using vector similarity search.
+        
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            document_id: Optional document ID to filter by
+            filters: Optional filters (e.g., chunk_type, has_arabic)
+            query_embedding: Precomputed query embedding (computed if omitted)
+        
+        Returns:
+            List of relevant chunks
+        """
+        # Embed off the event loop so concurrent searches keep running
+        if query_embedding is None:
+            query_embedding = await asyncio.to_thread(self.embedding_generator.embed_query, query)
+        
+        if settings.embedding_quantization != "fp32":
+            async with self.session_factory() as session:
+                stmt = _quantized_candidates_stmt(
+                    query_embedding, top_k, session.get_bind().dialect.name, document_id, filters
+                )
+                rows = (await session.execute(stmt)).all()
+                ids = _rank_quantized(rows, query_embedding, top_k)
+                chunks = (await session.scalars(_chunks_by_ids_stmt(ids))).all()
+            return _in_id_order(chunks, ids)
+        
+        sql, params = _vector_search_sql(query_embedding, top_k, document_id, filters)
+        
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(text(sql), params)
+                rows = result.fetchall()
+        except Exception:
+            # Same fallback as the sync path: let keyword search carry the query
+            return []
+        
+        return _rows_to_chunks(rows)
+
+    async def ahybrid_retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        document_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        keyword_weight: float = 0.3,
+        vector_weight: float = 0.7,
+    ) -> List[ChunkModel]:
+        """
+        Hybrid retrieval with vector and keyword search running concurrently.
+        
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            document_id: Optional document ID to filter by
+            filters: Optional filters
+            keyword_weight: Weight for keyword search (0-1)
+            vector_weight: Weight for vector search (0-1)
+        
+        Returns:
+            List of relevant chunks
+        """
+        # Query embedding overlaps with the keyword round-trip
+        vector_results, keyword_results = await asyncio.gather(
+            self.aretrieve(
+                query=query,
+                top_k=top_k * 2,
+                document_id=document_id,
+                filters=filters,
+            ),
+            self._akeyword_search(
+                query=query,
+                top_k=top_k * 2,
+                document_id=document_id,
+                filters=filters,
+            ),
         )
         
-        return sorted_chunks
+        return self._combine_results(
+            vector_results=vector_results,
+            keyword_results=keyword_results,
+            vector_weight=vector_weight,
+            keyword_weight=keyword_weight,
+            top_k=top_k,
+        )
+
+    async def _akeyword_search(
+        self,
+        query: str,
+        top_k: int,
+        document_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[ChunkModel]:
+        """Simple keyword-based search on its own session."""
+        stmt = _keyword_candidates_stmt(document_id, filters)
+        async with self.session_factory() as session:
+            candidates: List[ChunkModel] = (await session.scalars(stmt)).all()
+        return _rank_by_keywords(candidates, query, top_k)
 
 
 class Retriever:
@@ -221,6 +520,8 @@ class Retriever:
     def __init__(self, session: Session, use_hybrid: bool = True):
         self.session = session
         self.vector_retriever = VectorRetriever(session)
+        # Concurrent asyncpg pipeline for async callers, built on first use
+        self._async_retriever: Optional[AsyncVectorRetriever] = None
         self.use_hybrid = use_hybrid
 
     def retrieve(
@@ -245,3 +546,32 @@ class Retriever:
                 document_id=document_id,
                 filters=filters,
             )
+
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        document_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[ChunkModel]:
+        """Retrieve relevant chunks from async code."""
+        if db_manager.AsyncSessionLocal is None:
+            # No async engine (e.g. SQLite): run the sync path off the event loop
+            return await asyncio.to_thread(
+                self.retrieve, query, top_k, document_id, filters
+            )
+        if self._async_retriever is None:
+            self._async_retriever = AsyncVectorRetriever()
+        if self.use_hybrid:
+            return await self._async_retriever.ahybrid_retrieve(
+                query=query,
+                top_k=top_k,
+                document_id=document_id,
+                filters=filters,
+            )
+        return await self._async_retriever.aretrieve(
+            query=query,
+            top_k=top_k,
+            document_id=document_id,
+            filters=filters,
+        )
@@ -1,7 +1,10 @@
 """Text processing utilities for Arabic support."""
 
 import re
-from typing import List, Tuple
+import unicodedata
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
 
 
 # Arabic Unicode ranges
@@ -23,6 +26,59 @@ DIACRITICS = {
     '\u0670',  # Dagger Alif (superscript)
 }
 
+# Translation tables built once at import so normalization is a single C-level pass
+_DIAC_TABLE = {ord(c): None for c in DIACRITICS}
+
+_NORMALIZE_TABLE = str.maketrans({
+    'أ': 'ا',  # Alef variants
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',  # Alef wasla
+    'ه': 'ة',  # Heh variants
+    'ى': 'ي',  # Yeh variants
+    'ئ': 'ي',  # Hamza carriers
+    'ؤ': 'و',
+    '\u0640': None,  # Tatweel (kashida)
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+    **{chr(0x06F0 + d): str(d) for d in range(10)},  # Extended (Persian) digits
+    **_DIAC_TABLE,
+})
+
+# Compiled once at import; character classes mirror is_arabic_char and DIACRITICS
+_ARABIC_CLASS = '[\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF]'
+_ARABIC_CHAR_RE = re.compile(_ARABIC_CLASS)
+# A whitespace-delimited word containing at least one Arabic character
+_ARABIC_WORD_RE = re.compile(r'(?<!\S)\S*?' + _ARABIC_CLASS + r'\S*')
+_DIACRITICS_RE = re.compile('[' + ''.join(sorted(DIACRITICS)) + ']')
+_WHITESPACE_CHAR_RE = re.compile(r'\s')
+
+# Code point tables for analyze_text; str.isspace matches regex \s, and the
+# highest Unicode whitespace character is U+3000
+_ARABIC_RANGES = (
+    ARABIC_RANGE, ARABIC_EXTENDED_RANGE, ARABIC_PRESENTATION_RANGE, ARABIC_PRESENTATION_FORMS_B
+)
+_WHITESPACE_CODES = np.array([c for c in range(0x3001) if chr(c).isspace()], dtype=np.uint32)
+_DIACRITIC_CODES = np.array(sorted(ord(c) for c in DIACRITICS), dtype=np.uint32)
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+
+# Average characters per token for the heuristic in estimate_tokens
+ARABIC_CHARS_PER_TOKEN = 2.5
+ENGLISH_CHARS_PER_TOKEN = 4.0
+
+# Sentence delimiters by language; anything else uses the English set
+_SENTENCE_SPLITTERS = {
+    "ar": re.compile(r'[.!?؟]+'),
+    "en": re.compile(r'[.!?]+'),
+}
+
+# Punctuation is replaced with spaces before keyword matching
+_PUNCT_RE = re.compile(r'[^\w\s]', re.UNICODE)
+
+# Tanween fathatan next to an alef (any variant); alef-first is applied before
+# tanween-first so overlapping sequences resolve the same way as before
+_ALEF_TANWEEN_RE = re.compile('[\u0627\u0623\u0625\u0622]\u064B')
+_TANWEEN_ALEF_RE = re.compile('\u064B[\u0627\u0623\u0625\u0622]')
+
 
 def is_arabic_char(char: str) -> bool:
     """Check if a character is Arabic."""
@@ -46,14 +102,14 @@ def detect_arabic(text: str, threshold: float = 0.1) -> bool:
     Returns:
         True if text contains significant Arabic content
     """
-    if not text:
+    # ASCII-only text (checked in C without decoding) has no Arabic characters
+    if not text or text.isascii():
         return False
     
-    arabic_chars = sum(1 for char in text if is_arabic_char(char))
-    total_chars = len(text)
+    arabic_chars = len(_ARABIC_CHAR_RE.findall(text))
     
-    # Ignore whitespace and punctuation for ratio calculation
-    meaningful_chars = sum(1 for char in text if char.strip())
+    # Ignore whitespace for ratio calculation
+    meaningful_chars = len(text) - len(_WHITESPACE_CHAR_RE.findall(text))
     
     if meaningful_chars == 0:
         return False
@@ -72,7 +128,9 @@ def detect_diacritics(text: str) -> bool:
     Returns:
         True if text contains diacritics
     """
-    return any(char in DIACRITICS for char in text)
+    if text.isascii():
+        return False
+    return _DIACRITICS_RE.search(text) is not None
 
 
 def remove_diacritics(text: str) -> str:
@@ -85,16 +143,18 @@ def remove_diacritics(text: str) -> str:
     Returns:
         Text without diacritics
     """
-    return ''.join(char for char in text if char not in DIACRITICS)
+    return text.translate(_DIAC_TABLE)
 
 
 def normalize_arabic_text(text: str) -> str:
     """
     Normalize Arabic text by:
-    - Normalizing alef variants
+    - Folding presentation forms (NFKC)
+    - Normalizing alef variants (including alef wasla)
     - Normalizing heh variants
-    - Normalizing yeh variants
-    - Removing diacritics
+    - Normalizing yeh variants and hamza carriers
+    - Removing tatweel and diacritics
+    - Converting Arabic-Indic digits to ASCII
     
     Args:
         text: Text to normalize
@@ -102,33 +162,39 @@ def normalize_arabic_text(text: str) -> str:
     Returns:
         Normalized text
     """
-    # Normalize alef variants
-    text = re.sub(r'[أإآ]', 'ا', text)
-
-    # Normalize heh variants
-    text = re.sub(r'[هة]', 'ة', text)
-
-    # Normalize yeh variants
-    text = re.sub(r'[يى]', 'ي', text)
-
+    # Presentation forms (e.g. ﻻ, ﺔ) become their base letters
+    text = unicodedata.normalize('NFKC', text)
+    
     # Convert tanween fathatan on alif (اً) to ta marbuta (ة)
-    text = re.sub('\u0627\u064B', 'ة', text)
+    text = _ALEF_TANWEEN_RE.sub('ة', text)
     # Handle case where tanween comes before alif (ًا)
-    text = re.sub('\u064B\u0627', 'ة', text)
+    text = _TANWEEN_ALEF_RE.sub('ة', text)
 
-    # Remove diacritics
-    text = remove_diacritics(text)
+    # Normalize letter variants and digits, drop tatweel and diacritics in one pass
+    return text.translate(_NORMALIZE_TABLE)
+
+
+def normalize_for_search(text: str) -> str:
+    """
+    Normalize text for diacritic-insensitive keyword matching.
+    
+    Applies normalize_arabic_text, replaces punctuation with spaces and
+    lowercases. Used for both stored chunk content and query keywords.
     
-    return text
+    Args:
+        text: Text to normalize
+    
+    Returns:
+        Search-normalized text
+    """
+    return _PUNCT_RE.sub(' ', normalize_arabic_text(text)).lower()
 
 
 def count_arabic_words(text: str) -> int:
     """Count Arabic words in text."""
-    arabic_words = []
-    for word in text.split():
-        if any(is_arabic_char(char) for char in word):
-            arabic_words.append(word)
-    return len(arabic_words)
+    if text.isascii():
+        return 0
+    return sum(1 for _ in _ARABIC_WORD_RE.finditer(text))
 
 
 def extract_sentences(text: str, language: str = "ar") -> List[str]:
@@ -142,33 +208,128 @@ def extract_sentences(text: str, language: str = "ar") -> List[str]:
     Returns:
         List of sentences
     """
-    if language == "ar":
-        # Arabic sentence delimiters
-        delimiters = r'[.!?؟]+'
-    else:
-        # English sentence delimiters
-        delimiters = r'[.!?]+'
-    
-    sentences = re.split(delimiters, text)
-    return [s.strip() for s in sentences if s.strip()]
+    splitter = _SENTENCE_SPLITTERS.get(language, _SENTENCE_SPLITTERS["en"])
+    return [s for s in (part.strip() for part in splitter.split(text)) if s]
 
 
 def clean_whitespace(text: str) -> str:
     """Clean up whitespace in text."""
-    # Replace multiple spaces with single space
-    text = re.sub(r'\s+', ' ', text)
-    # Remove leading/trailing whitespace
-    text = text.strip()
-    return text
+    # Collapse whitespace runs to single spaces, then trim the ends
+    return _WHITESPACE_RUN_RE.sub(' ', text).strip()
 
 
-def estimate_tokens(text: str) -> int:
+def estimate_tokens(text: str, exact: bool = False, model: Optional[str] = None) -> int:
     """
     Estimate token count for text.
-    Simple approximation: ~4 characters per token for Arabic, ~4 for English.
+    Character-ratio approximation: ~2.5 characters per token for Arabic, ~4 for English.
+    
+    Args:
+        text: Text to measure
+        exact: Count with the tiktoken encoder when it is available
+        model: Model used to pick the encoder when exact is set
+    
+    Returns:
+        Token count (0 for empty text, at least 1 otherwise)
     """
-    # Check if text is predominantly Arabic
-    is_arabic = detect_arabic(text)
+    if not text:
+        return 0
+    if exact:
+        encoder = get_token_encoder(model)
+        if encoder is not None:
+            return len(encoder.encode(text))
+    return _estimate_from_length(len(text), detect_arabic(text))
+
+
+def _estimate_from_length(char_count: int, is_arabic: bool) -> int:
+    """Apply the per-script characters-per-token ratio."""
+    if not char_count:
+        return 0
+    ratio = ARABIC_CHARS_PER_TOKEN if is_arabic else ENGLISH_CHARS_PER_TOKEN
+    return max(1, int(char_count / ratio))
+
+
+class TextStats(NamedTuple):
+    """Per-text statistics computed together by analyze_text."""
+    has_arabic: bool
+    has_diacritics: bool
+    arabic_word_count: int
+    char_count: int
+    token_count: int
+
+
+def analyze_text(text: str) -> TextStats:
+    """
+    Compute the Arabic flags, word count and token estimate for text in one scan.
+    
+    Same results as detect_arabic, detect_diacritics, count_arabic_words and
+    estimate_tokens, from a single walk over the text's code points.
+    
+    Args:
+        text: Text to analyze
+    
+    Returns:
+        TextStats for the text
+    """
+    char_count = len(text)
+    # ASCII-only text (checked in C without decoding) has no Arabic characters
+    if text.isascii():
+        return TextStats(False, False, 0, char_count, _estimate_from_length(char_count, False))
+    
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    is_space = np.isin(codes, _WHITESPACE_CODES)
+    is_arabic = np.zeros(codes.shape, dtype=bool)
+    for low, high in _ARABIC_RANGES:
+        is_arabic |= (codes >= low) & (codes <= high)
     
-    # Simple approximation
-    return len(text) // 4
+    # Words are whitespace-delimited; number them so each Arabic word counts once
+    word_ids = np.cumsum(~is_space & np.concatenate(([True], is_space[:-1])))
+    arabic_word_ids = word_ids[is_arabic]
+    arabic_words = int(arabic_word_ids.size and 1 + np.count_nonzero(np.diff(arabic_word_ids)))
+    
+    meaningful_chars = char_count - int(np.count_nonzero(is_space))
+    has_arabic = bool(meaningful_chars) and arabic_word_ids.size / meaningful_chars >= 0.1
+    return TextStats(
+        has_arabic=has_arabic,
+        has_diacritics=bool(np.isin(codes, _DIACRITIC_CODES).any()),
+        arabic_word_count=arabic_words,
+        char_count=char_count,
+        token_count=_estimate_from_length(char_count, has_arabic),
+    )
+
+
+# Encoders that loaded successfully, by model; failures are retried on the next call
+_TOKEN_ENCODERS: Dict[Optional[str], Any] = {}
+
+
+def get_token_encoder(model: Optional[str] = None):
+    """
+    Get a cached tiktoken encoder for a model.
+    
+    Models unknown to tiktoken (e.g. Claude) use cl100k_base as an approximation.
+    
+    Args:
+        model: Model name
+    
+    Returns:
+        Encoder instance, or None if tiktoken is not available or failed to load
+    """
+    encoder = _TOKEN_ENCODERS.get(model)
+    if encoder is not None:
+        return encoder
+    
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        try:
+            encoder = tiktoken.encoding_for_model(model or "")
+        except KeyError:
+            encoder = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Often a transient download failure; don't pin the fallback for good
+        print(f"Warning: Failed to load tokenizer: {e}")
+        return None
+    _TOKEN_ENCODERS[model] = encoder
+    return encoder
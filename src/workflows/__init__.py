@@ -6,4 +6,8 @@
 __all__ = [
     "DocumentProcessingWorkflow",
     "process_document_with_workflow",
+    "process_documents_with_workflow",
+    "process_documents_with_batch_api",
+    "get_document_workflow",
+    "close_document_workflow",
 ]
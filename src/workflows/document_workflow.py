@@ -1,6 +1,24 @@
 """LlamaIndex Workflows for intelligent document processing."""
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+import numpy as np
+import anthropic
+import openai
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 from llama_index.core import Document as LlamaDocument
 from llama_index.core.workflow import (
     Workflow,
@@ -14,14 +32,153 @@ from llama_index.llms.anthropic import Anthropic
 from src.models.document import Document, Chunk
 from src.chunking.strategies import IntelligentChunker, FixedChunker, DynamicChunker
 from src.embeddings.generator import get_embedding_generator
+from src.embeddings.batcher import AsyncEmbeddingBatcher
+from src.embeddings.quantization import quantize_chunks
 from src.arabic.processor import get_arabic_processor
+from src.workflows.strategy_classifier import StrategyClassifier, document_features
 from src.config.settings import settings
 
+logger = logging.getLogger(__name__)
 
-class DocumentAnalysisEvent:
-    """Event for document analysis."""
-    def __init__(self, document: Document):
-        self.document = document
+
+# Markdown headings mark structured content that dynamic chunking handles well
+_HEADING_RE = re.compile(r'^#{1,6} ', re.MULTILINE)
+
+# Compiled once for analysing documents whose metadata was never populated
+_ARABIC_RE = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF]')
+_DIACRITIC_RE = re.compile(r'[\u064B-\u0652]')
+
+
+def _heuristic_decide(document: Document) -> Optional[str]:
+    """
+    Pick a chunking strategy without the LLM when the answer is obvious.
+    
+    Returns:
+        "fixed" for trivially short documents, "dynamic" for documents with
+        markdown headings, or None when the LLM should decide
+    """
+    word_count = document.metadata.word_count
+    if word_count is not None and word_count < settings.llm_fastpath_word_threshold:
+        return "fixed"
+    if _HEADING_RE.search(document.content):
+        return "dynamic"
+    return None
+
+
+def _decision_prompt(document: Document) -> str:
+    """Build the chunking-decision prompt from the document analysis."""
+    # Bind only the small values the prompt needs; nothing here refers to the full content
+    metadata = document.metadata
+    title, lang, has_ar, has_d, wc, pc = (
+        metadata.title,
+        metadata.language,
+        metadata.has_arabic,
+        metadata.has_diacritics,
+        metadata.word_count,
+        metadata.page_count,
+    )
+    sample = document.analysis['content_sample_1000']
+    return f"""Analyze this document and decide the best chunking strategy.
+
+Document Info:
+- Title: {title}
+- Language: {lang}
+- Has Arabic: {has_ar}
+- Has Diacritics: {has_d}
+- Word Count: {wc}
+- Page Count: {pc}
+
+Content Sample:
+{sample}
+
+Decide the best chunking strategy:
+1. "fixed" - For uniform, structured documents (reports, forms)
+2. "dynamic" - For documents with varying structure (books, mixed content)
+3. "intelligent" - Let the system decide based on content analysis
+
+Respond with just the strategy name (one word)."""
+
+
+def _parse_decision(text: str) -> str:
+    """Extract a valid strategy label from an LLM answer."""
+    words = text.strip().lower().split()
+    decision = words[0].strip('"\'.,') if words else ""
+    # Validate decision
+    return decision if decision in DECISION_LABELS else "intelligent"
+
+
+# Maximum cached chunking decisions (exact and semantic each)
+DECISION_CACHE_SIZE = 1024
+
+# Documents above this word count are chunked in a worker process (avoids the GIL)
+PROCESS_POOL_WORD_THRESHOLD = 50_000
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Get or create the process pool used for chunking very large documents."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor()
+    return _process_pool
+
+
+# Chunks handed to the embedder at a time while chunking is still running
+CHUNK_STREAM_BATCH_SIZE = 64
+
+
+async def aiter_chunked(iterator, n: int = CHUNK_STREAM_BATCH_SIZE) -> AsyncIterator[List[Chunk]]:
+    """
+    Drain a synchronous chunk generator in a worker thread, n chunks at a time.
+    
+    Args:
+        iterator: Iterator of chunks (e.g. chunker.iter_chunks(document))
+        n: Batch size
+    
+    Yields:
+        Lists of up to n chunks, in order
+    """
+    iterator = iter(iterator)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(itertools.islice(iterator, n)))
+        if not batch:
+            return
+        yield batch
+
+
+# Small models used for chunking decisions when LLM_ROUTER_MODEL=auto
+DEFAULT_ROUTER_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-haiku-20240307",
+}
+
+# Transient provider errors (429s, timeouts, 5xx) worth retrying; auth errors etc. are not
+RETRYABLE_LLM_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+)
+
+
+def _log_llm_retry(retry_state):
+    """Log a retried decision call with the document it belongs to."""
+    logger.debug(
+        "Retrying chunking decision for %s (attempt %d): %s",
+        retry_state.kwargs.get("document_id"),
+        retry_state.attempt_number,
+        retry_state.outcome.exception(),
+    )
+
+
+# Valid chunking decisions
+DECISION_LABELS = ("fixed", "dynamic", "intelligent")
+
+# Classifier predictions below this confidence fall back to the LLM (if enabled)
+CLASSIFIER_MIN_CONFIDENCE = 0.7
 
 
 class ChunkingDecisionEvent:
@@ -32,10 +189,11 @@ class ChunkingDecisionEvent:
 
 
 class ChunkingEvent:
-    """Event for chunking."""
-    def __init__(self, document: Document, chunks: List[Chunk]):
+    """Event for chunking; embedding_task finishes once every chunk is embedded."""
+    def __init__(self, document: Document, chunks: List[Chunk], embedding_task: asyncio.Task):
         self.document = document
         self.chunks = chunks
+        self.embedding_task = embedding_task
 
 
 class EmbeddingEvent:
@@ -44,132 +202,364 @@ class EmbeddingEvent:
         self.chunks = chunks
 
 
-class DocumentProcessingWorkflow(Workflow):
-    """LlamaIndex workflow for intelligent document processing."""
+class WorkflowComponents:
+    """
+    Models, clients and chunkers used by the workflow, built on first use.
+    
+    Kept off the Workflow subclass itself: step discovery inspects every
+    attribute of the workflow instance, which would evaluate lazy properties
+    defined there and load everything up front.
+    """
 
-    def __init__(self):
-        super().__init__()
-        self.embedding_generator = get_embedding_generator()
-        self.arabic_processor = get_arabic_processor()
-        
-        # Initialize LLM for decision making
+    @cached_property
+    def embedding_generator(self):
+        """Shared embedding generator."""
+        return get_embedding_generator()
+
+    @cached_property
+    def embedding_batcher(self) -> AsyncEmbeddingBatcher:
+        """Coalesces chunk embeddings across concurrent documents."""
+        return AsyncEmbeddingBatcher(self.embedding_generator)
+
+    @cached_property
+    def arabic_processor(self):
+        """Shared Arabic processor."""
+        return get_arabic_processor()
+
+    @cached_property
+    def llm(self):
+        """LLM for decision making, or None when no API key is configured."""
         if settings.openai_api_key:
-            self.llm = OpenAI(api_key=settings.openai_api_key, model=settings.llm_model)
+            return OpenAI(api_key=settings.openai_api_key, model=settings.llm_model)
         elif settings.anthropic_api_key:
-            self.llm = Anthropic(api_key=settings.anthropic_api_key, model=settings.llm_model)
-        else:
-            self.llm = None
-        
-        # Initialize chunkers
-        self.fixed_chunker = FixedChunker(
+            return Anthropic(api_key=settings.anthropic_api_key, model=settings.llm_model)
+        return None
+
+    @cached_property
+    def router_llm(self):
+        """Small, cheap LLM used only for chunking decisions."""
+        model = settings.llm_router_model
+        if not model or self.llm is None:
+            return self.llm
+        if settings.openai_api_key:
+            return OpenAI(
+                api_key=settings.openai_api_key,
+                model=DEFAULT_ROUTER_MODELS["openai"] if model == "auto" else model,
+            )
+        return Anthropic(
+            api_key=settings.anthropic_api_key,
+            model=DEFAULT_ROUTER_MODELS["anthropic"] if model == "auto" else model,
+        )
+
+    @cached_property
+    def decision_llm_kwargs(self) -> Dict[str, Any]:
+        """Completion options constraining the decision LLM to a short label."""
+        # No logit_bias: forcing label tokens also blocks stop/EOS, so answers run on
+        # ("fixedfixed"); the short greedy answer is validated by _parse_decision
+        kwargs: Dict[str, Any] = {"max_tokens": 4, "temperature": 0}
+        if isinstance(self.router_llm, Anthropic):
+            kwargs["stop_sequences"] = ["\n"]
+        return kwargs
+
+    @cached_property
+    def classifier(self) -> StrategyClassifier:
+        """Distilled chunking-strategy classifier."""
+        return StrategyClassifier()
+
+    @cached_property
+    def fixed_chunker(self) -> FixedChunker:
+        """Fixed-size chunker."""
+        return FixedChunker(
             chunk_size=settings.chunk_size,
             overlap=settings.chunk_overlap,
         )
-        self.dynamic_chunker = DynamicChunker(
+
+    @cached_property
+    def dynamic_chunker(self) -> DynamicChunker:
+        """Structure-aware chunker."""
+        return DynamicChunker(
             max_chunk_size=1000,
             min_chunk_size=200,
         )
-        self.intelligent_chunker = IntelligentChunker(
+
+    @cached_property
+    def intelligent_chunker(self) -> IntelligentChunker:
+        """Chunker that picks fixed or dynamic per document."""
+        return IntelligentChunker(
             fixed_chunker=self.fixed_chunker,
             dynamic_chunker=self.dynamic_chunker,
         )
 
+
+class DocumentProcessingWorkflow(Workflow):
+    """LlamaIndex workflow for intelligent document processing."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.components = WorkflowComponents()
+        # LLM chunking decisions, keyed by document fingerprint (LRU)
+        self._decision_cache: "OrderedDict[str, str]" = OrderedDict()
+        # (normalized sample embedding, decision) pairs for near-duplicate lookups
+        self._semantic_decisions: List[Tuple[np.ndarray, str]] = []
+
+    async def close(self):
+        """Release the LLMs' HTTP clients, if any were created."""
+        llms = [self.components.__dict__.pop(name, None) for name in ("router_llm", "llm")]
+        closed = set()
+        for llm in llms:
+            if llm is None or id(llm) in closed:
+                continue
+            closed.add(id(llm))
+            for attr in ("_aclient", "_client"):
+                client = getattr(llm, attr, None)
+                close = getattr(client, "aclose", None) or getattr(client, "close", None)
+                if close is None:
+                    continue
+                try:
+                    result = close()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    logger.warning("Failed to close LLM client: %s", e)
+
     @step()
-    async def analyze_document(self, ev: StartEvent) -> DocumentAnalysisEvent:
-        """Analyze document structure and content."""
+    async def decide_chunking_strategy(self, ev: StartEvent) -> ChunkingDecisionEvent:
+        """Analyze the document and decide on a chunking strategy (heuristics, classifier, then LLM)."""
         document = ev.document
+        self._analyze_document(document)
+        
+        decision = self._quick_decision(document)
+        if decision is None:
+            decision = await self._llm_decision(document)
+        
+        return ChunkingDecisionEvent(document=document, decision=decision)
+
+    def _analyze_document(self, document: Document) -> Dict[str, Any]:
+        """Compute decision features and store them on document.analysis (once per document)."""
+        if document.analysis:
+            return document.analysis
+        
+        # Slice the samples once; later code reuses them from the analysis
+        sample_1000 = document.content[:1000]
+        
+        metadata = document.metadata
+        has_arabic, has_diacritics = metadata.has_arabic, metadata.has_diacritics
+        if metadata.word_count is None:
+            # Metadata was never filled in by a loader; scan the content directly
+            has_arabic = bool(_ARABIC_RE.search(document.content))
+            has_diacritics = has_arabic and bool(_DIACRITIC_RE.search(document.content))
         
         # Extract key features
         features = {
             "language": document.metadata.language,
-            "has_arabic": document.metadata.has_arabic,
-            "has_diacritics": document.metadata.has_diacritics,
+            "has_arabic": has_arabic,
+            "has_diacritics": has_diacritics,
             "word_count": document.metadata.word_count,
             "page_count": document.metadata.page_count or 0,
             "title": document.metadata.title,
-            "content_sample": document.content[:500],
+            "content_sample_500": sample_1000[:500],
+            "content_sample_1000": sample_1000,
+            **document_features(document.content),
         }
         
         # Store analysis in document
         document.analysis = features
+        return features
+
+    def _quick_decision(self, document: Document) -> Optional[str]:
+        """Decide without calling the LLM; None when the LLM should be asked."""
+        # Skip the LLM round-trip for unambiguous documents
+        decision = _heuristic_decide(document)
+        if decision is not None:
+            return decision
+        
+        # Distilled classifier answers in microseconds when it is confident;
+        # without a trained model it predicts nothing and the LLM decides
+        decision, confidence = self.components.classifier.predict(document.analysis)
+        if decision is not None and confidence >= CLASSIFIER_MIN_CONFIDENCE:
+            return decision
         
-        return DocumentAnalysisEvent(document=document)
+        if not (settings.use_llm_decision and self.components.router_llm):
+            # Fallback to intelligent chunking (or a low-confidence prediction)
+            return decision or "intelligent"
+        
+        # Reuse earlier decisions for identical documents
+        return self._lookup_decision(self._decision_cache_key(document))
 
-    @step()
-    async def decide_chunking_strategy(
-        self, ev: DocumentAnalysisEvent
-    ) -> ChunkingDecisionEvent:
-        """Decide on the best chunking strategy using LLM."""
-        document = ev.document
+    async def _llm_decision(self, document: Document) -> str:
+        """Ask the router LLM for a chunking decision, using the semantic cache first."""
+        cache_key = self._decision_cache_key(document)
+        sample_embedding = None
+        if settings.decision_semantic_cache:
+            sample_embedding = await asyncio.to_thread(
+                self._sample_embedding, document.analysis["content_sample_1000"]
+            )
+            decision = self._lookup_similar_decision(sample_embedding)
+            if decision is not None:
+                return decision
+        
+        try:
+            # Only the prompt string and id are held across the network await
+            prompt, document_id = _decision_prompt(document), document.id
+            text = await self._ask_llm(prompt, document_id=document_id)
+            decision = _parse_decision(text)
+            self._store_decision(cache_key, sample_embedding, decision)
+        except Exception as e:
+            logger.warning("LLM decision failed for %s: %s", document.id, e)
+            decision = "intelligent"
         
-        if self.llm:
-            # Use LLM to make intelligent decision
-            prompt = f"""Analyze this document and decide the best chunking strategy.
+        return decision
 
-Document Info:
-- Title: {document.metadata.title}
-- Language: {document.metadata.language}
-- Has Arabic: {document.metadata.has_arabic}
-- Has Diacritics: {document.metadata.has_diacritics}
-- Word Count: {document.metadata.word_count}
-- Page Count: {document.metadata.page_count}
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(multiplier=0.5, max=8),
+        retry=retry_if_exception_type(RETRYABLE_LLM_ERRORS),
+        before_sleep=_log_llm_retry,
+        reraise=True,
+    )
+    async def _ask_llm(self, prompt: str, document_id: Optional[str] = None) -> str:
+        """Send the decision prompt to the router LLM, retrying transient errors."""
+        # One-word answer: cap output tokens and decode greedily
+        components = self.components
+        response = await components.router_llm.acomplete(prompt, **components.decision_llm_kwargs)
+        return response.text
 
-Content Sample:
-{document.content[:1000]}
+    def _decision_cache_key(self, document: Document) -> str:
+        """Fingerprint the document fields the chunking decision depends on."""
+        metadata = document.metadata
+        word_bucket = (metadata.word_count or 0) // 100
+        sample = document.analysis.get("content_sample_1000")
+        if sample is None:
+            sample = document.content[:1000]
+        raw = f"{metadata.title}|{metadata.language}|{word_bucket}|{sample}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
 
-Decide the best chunking strategy:
-1. "fixed" - For uniform, structured documents (reports, forms)
-2. "dynamic" - For documents with varying structure (books, mixed content)
-3. "intelligent" - Let the system decide based on content analysis
+    def _sample_embedding(self, sample: str) -> np.ndarray:
+        """Embed a content sample as a unit vector for cosine lookups."""
+        embedding = np.asarray(
+            self.components.embedding_generator.embed_text(sample), dtype=np.float32
+        )
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
 
-Respond with just the strategy name (one word)."""
+    def _lookup_decision(self, key: str) -> Optional[str]:
+        """Return the cached decision for an exact fingerprint match."""
+        decision = self._decision_cache.get(key)
+        if decision is not None:
+            self._decision_cache.move_to_end(key)
+        return decision
 
-            try:
-                response = await self.llm.achat_complete(prompt)
-                decision = str(response).strip().lower()
-                
-                # Validate decision
-                if decision not in ["fixed", "dynamic", "intelligent"]:
-                    decision = "intelligent"
-            except Exception as e:
-                print(f"LLM decision failed: {e}")
-                decision = "intelligent"
-        else:
-            # Fallback to intelligent chunking
-            decision = "intelligent"
+    def _lookup_similar_decision(self, sample_embedding: np.ndarray) -> Optional[str]:
+        """Return the decision cached for the most similar content sample, if close enough."""
+        if not self._semantic_decisions:
+            return None
+        matrix = np.stack([e for e, _ in self._semantic_decisions])
+        similarities = matrix @ sample_embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= settings.decision_semantic_threshold:
+            return self._semantic_decisions[best][1]
+        return None
+
+    def _store_decision(
+        self, key: str, sample_embedding: Optional[np.ndarray], decision: str
+    ):
+        """Cache an LLM decision, evicting the least recently used entries."""
+        self._decision_cache[key] = decision
+        self._decision_cache.move_to_end(key)
+        if len(self._decision_cache) > DECISION_CACHE_SIZE:
+            self._decision_cache.popitem(last=False)
         
-        return ChunkingDecisionEvent(document=document, decision=decision)
+        if sample_embedding is not None:
+            self._semantic_decisions.append((sample_embedding, decision))
+            if len(self._semantic_decisions) > DECISION_CACHE_SIZE:
+                self._semantic_decisions.pop(0)
 
     @step()
     async def apply_chunking(self, ev: ChunkingDecisionEvent) -> ChunkingEvent:
         """Apply the chosen chunking strategy."""
         document = ev.document
-        decision = ev.decision
+        chunks, embedding_task = await self._chunk_and_embed(document, ev.decision)
+        return ChunkingEvent(document=document, chunks=chunks, embedding_task=embedding_task)
+
+    async def _chunk_and_embed(
+        self, document: Document, decision: str
+    ) -> Tuple[List[Chunk], asyncio.Task]:
+        """
+        Chunk a document while embedding finished batches in the background.
         
+        Returns:
+            Tuple of (chunks, task that completes when all chunks are embedded)
+        """
+        embed_queue: asyncio.Queue = asyncio.Queue()
+        embedding_task = asyncio.create_task(self._embed_from_queue(embed_queue))
+        try:
+            chunks = await self._chunk_document(document, decision, embed_queue)
+        except BaseException:
+            embedding_task.cancel()
+            raise
+        finally:
+            # Sentinel: no more batches
+            embed_queue.put_nowait(None)
+        return chunks, embedding_task
+
+    async def _chunk_document(
+        self,
+        document: Document,
+        decision: str,
+        embed_queue: Optional[asyncio.Queue] = None,
+    ) -> List[Chunk]:
+        """Chunk a document with the strategy named by the decision."""
         # Apply chunking based on decision
         if decision == "fixed":
-            chunks = self.fixed_chunker.chunk(document)
-            document.chunking_strategy = "fixed"
+            chunker = self.components.fixed_chunker
         elif decision == "dynamic":
-            chunks = self.dynamic_chunker.chunk(document)
-            document.chunking_strategy = "dynamic"
+            chunker = self.components.dynamic_chunker
         else:
-            chunks = self.intelligent_chunker.chunk(document)
-            document.chunking_strategy = "intelligent"
+            chunker = self.components.intelligent_chunker
+            decision = "intelligent"
         
-        document.chunks = chunks
+        chunks: List[Chunk] = []
+        async for batch in self._run_chunker(chunker, document):
+            chunks.extend(batch)
+            if embed_queue is not None:
+                await embed_queue.put(batch)
         
-        return ChunkingEvent(document=document, chunks=chunks)
+        document.chunking_strategy = decision
+        document.chunks = chunks
+        return chunks
+
+    async def _run_chunker(self, chunker, document: Document) -> AsyncIterator[List[Chunk]]:
+        """Chunk off the event loop; very large documents go to a worker process."""
+        if (document.metadata.word_count or 0) > PROCESS_POOL_WORD_THRESHOLD:
+            # Generators can't cross the process boundary; stream the finished list
+            loop = asyncio.get_running_loop()
+            chunks = await loop.run_in_executor(_get_process_pool(), chunker.chunk, document)
+            for start in range(0, len(chunks), CHUNK_STREAM_BATCH_SIZE):
+                yield chunks[start:start + CHUNK_STREAM_BATCH_SIZE]
+            return
+        async for batch in aiter_chunked(chunker.iter_chunks(document)):
+            yield batch
 
     @step()
     async def generate_embeddings(self, ev: ChunkingEvent) -> EmbeddingEvent:
-        """Generate embeddings for chunks."""
-        chunks = ev.chunks
-        
+        """Wait for the embeddings streamed during chunking to drain."""
+        await ev.embedding_task
+        return EmbeddingEvent(chunks=ev.chunks)
+
+    async def _embed_from_queue(self, embed_queue: asyncio.Queue):
+        """Embed chunk batches from the queue until the None sentinel arrives."""
+        while (batch := await embed_queue.get()) is not None:
+            await self._embed_chunks(batch)
+
+    async def _embed_chunks(self, chunks: List[Chunk]):
+        """Embed chunks in place."""
         if chunks:
-            self.embedding_generator.embed_chunks(chunks)
-        
-        return EmbeddingEvent(chunks=chunks)
+            # Batched with chunks from other documents in flight
+            embeddings = await self.components.embedding_batcher.submit(chunks)
+            for chunk, embedding in zip(chunks, embeddings):
+                chunk.embedding = embedding
+            # Keep only the configured storage form
+            quantize_chunks(chunks)
 
     @step()
     async def finalize(self, ev: EmbeddingEvent) -> StopEvent:
@@ -177,10 +567,180 @@ Respond with just the strategy name (one word)."""
         return StopEvent(result={"chunks": ev.chunks, "status": "completed"})
 
 
+# Global workflow instance, built on first use
+_workflow_singleton: Optional[DocumentProcessingWorkflow] = None
+_workflow_lock = asyncio.Lock()
+
+
+async def get_document_workflow() -> DocumentProcessingWorkflow:
+    """Get or create the shared document processing workflow."""
+    global _workflow_singleton
+    if _workflow_singleton is None:
+        async with _workflow_lock:
+            if _workflow_singleton is None:
+                _workflow_singleton = DocumentProcessingWorkflow()
+    return _workflow_singleton
+
+
+async def close_document_workflow():
+    """Close the shared workflow and chunking pool; the next call builds fresh ones."""
+    global _workflow_singleton, _process_pool
+    if _process_pool is not None:
+        pool, _process_pool = _process_pool, None
+        pool.shutdown(wait=False, cancel_futures=True)
+    if _workflow_singleton is not None:
+        workflow, _workflow_singleton = _workflow_singleton, None
+        await workflow.close()
+
+
 async def process_document_with_workflow(document: Document) -> Dict[str, Any]:
     """Process a document using LlamaIndex workflow."""
-    workflow = DocumentProcessingWorkflow()
+    workflow = await get_document_workflow()
     
     result = await workflow.run(document=document)
     
     return result
+
+
+async def process_documents_with_workflow(
+    documents: List[Document], concurrency: Optional[int] = None
+) -> List[Any]:
+    """
+    Process several documents through the workflow concurrently.
+    
+    Concurrency mostly helps the LLM-bound strategy decision; CPU-bound
+    chunking and embedding gain little from it.
+    
+    Args:
+        documents: Documents to process
+        concurrency: Maximum documents in flight (default: settings.workflow_concurrency)
+    
+    Returns:
+        One result per document, in order; failures are returned as exceptions
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.workflow_concurrency)
+
+    async def _run(document: Document) -> Dict[str, Any]:
+        async with semaphore:
+            return await process_document_with_workflow(document)
+
+    return await asyncio.gather(*[_run(d) for d in documents], return_exceptions=True)
+
+
+async def process_documents_with_batch_api(
+    documents: List[Document],
+    poll_interval: float = 30.0,
+    concurrency: Optional[int] = None,
+) -> List[Any]:
+    """
+    Bulk-process documents, sending ambiguous chunking decisions to the OpenAI Batch API.
+    
+    Documents that heuristics, the classifier or the decision cache can settle
+    skip the LLM entirely; the rest are decided in one batch job (half the cost
+    of live calls, completion within 24h) before chunking and embedding resume.
+    Without an OpenAI router model, pending decisions are made with live calls.
+    
+    Args:
+        documents: Documents to process
+        poll_interval: Seconds between batch status checks
+        concurrency: Maximum documents chunked at once (default: settings.workflow_concurrency)
+    
+    Returns:
+        One result per document, in order; failures are returned as exceptions
+    """
+    workflow = await get_document_workflow()
+    
+    decisions: Dict[str, str] = {}
+    pending: List[Document] = []
+    for document in documents:
+        workflow._analyze_document(document)
+        decision = workflow._quick_decision(document)
+        if decision is None:
+            pending.append(document)
+        else:
+            decisions[document.id] = decision
+    
+    if pending:
+        if isinstance(workflow.components.router_llm, OpenAI):
+            decisions.update(await _batch_decisions(workflow, pending, poll_interval))
+        else:
+            labels = await asyncio.gather(*[workflow._llm_decision(d) for d in pending])
+            decisions.update(zip((d.id for d in pending), labels))
+    
+    semaphore = asyncio.Semaphore(concurrency or settings.workflow_concurrency)
+    
+    async def _run(document: Document) -> Dict[str, Any]:
+        async with semaphore:
+            chunks, embedding_task = await workflow._chunk_and_embed(
+                document, decisions.get(document.id, "intelligent")
+            )
+            await embedding_task
+            return {"chunks": chunks, "status": "completed"}
+    
+    return await asyncio.gather(*[_run(d) for d in documents], return_exceptions=True)
+
+
+async def _batch_decisions(
+    workflow: DocumentProcessingWorkflow,
+    documents: List[Document],
+    poll_interval: float,
+) -> Dict[str, str]:
+    """Run chunking decisions through the OpenAI Batch API, keyed by document ID."""
+    from openai import AsyncOpenAI
+    
+    client = AsyncOpenAI(api_key=settings.openai_api_key)
+    body_options = dict(workflow.components.decision_llm_kwargs)
+    lines = [
+        json.dumps({
+            "custom_id": document.id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": workflow.components.router_llm.model,
+                "messages": [{"role": "user", "content": _decision_prompt(document)}],
+                **body_options,
+            },
+        }, ensure_ascii=False)
+        for document in documents
+    ]
+    
+    decisions: Dict[str, str] = {}
+    try:
+        input_file = await client.files.create(
+            file=("batchinput.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(poll_interval)
+            batch = await client.batches.retrieve(batch.id)
+        
+        if batch.output_file_id:
+            output = await client.files.content(batch.output_file_id)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                try:
+                    text = record["response"]["body"]["choices"][0]["message"]["content"] or ""
+                except (KeyError, IndexError, TypeError):
+                    continue
+                decisions[record["custom_id"]] = _parse_decision(text)
+        if batch.status != "completed":
+            logger.warning("Batch decision job ended with status %s", batch.status)
+    except Exception as e:
+        logger.warning("Batch decision failed: %s", e)
+    finally:
+        await client.close()
+    
+    # Remember the answers for future ingests of the same documents
+    for document in documents:
+        if document.id in decisions:
+            workflow._store_decision(
+                workflow._decision_cache_key(document), None, decisions[document.id]
+            )
+    return decisions
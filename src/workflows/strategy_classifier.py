@@ -0,0 +1,121 @@
+"""Lightweight chunking-strategy classifier distilled from LLM decisions."""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config.settings import settings
+
+# Feature order expected by trained models
+FEATURE_NAMES = [
+    "is_arabic_language",
+    "has_arabic",
+    "word_count",
+    "heading_count",
+    "avg_line_length",
+]
+
+_HEADING_LINE_RE = re.compile(r'^#{1,6}\s', re.MULTILINE)
+
+
+def document_features(content: str) -> Dict[str, Any]:
+    """
+    Compute the structural features used by the classifier.
+
+    Args:
+        content: Document text
+
+    Returns:
+        Dictionary with heading_count and avg_line_length
+    """
+    lines = [line for line in content.splitlines() if line.strip()]
+    return {
+        "heading_count": len(_HEADING_LINE_RE.findall(content)),
+        "avg_line_length": sum(len(line) for line in lines) / len(lines) if lines else 0.0,
+    }
+
+
+def feature_vector(analysis: Dict[str, Any]) -> List[float]:
+    """Build the classifier input from a document analysis dictionary."""
+    return [
+        1.0 if analysis.get("language") == "ar" else 0.0,
+        1.0 if analysis.get("has_arabic") else 0.0,
+        float(analysis.get("word_count") or 0),
+        float(analysis.get("heading_count") or 0),
+        float(analysis.get("avg_line_length") or 0.0),
+    ]
+
+
+class StrategyClassifier:
+    """Predicts a chunking strategy from document features."""
+
+    def __init__(self, model_path: Optional[str] = None):
+        """
+        Load a trained model if one is available.
+
+        Args:
+            model_path: Path to a joblib-pickled sklearn classifier
+                (default: settings.strategy_classifier_path)
+        """
+        self.model_path = model_path or settings.strategy_classifier_path
+        self.model = None
+        self._load_model()
+
+    def _load_model(self):
+        """Load the joblib model; leave it unset when missing or unusable."""
+        if not self.model_path or not Path(self.model_path).exists():
+            return
+        try:
+            import joblib
+            self.model = joblib.load(self.model_path)
+        except Exception as e:
+            print(f"Warning: Could not load strategy classifier: {e}")
+            self.model = None
+
+    @property
+    def available(self) -> bool:
+        """Whether a trained model is loaded."""
+        return self.model is not None
+
+    def predict(self, analysis: Dict[str, Any]) -> Tuple[Optional[str], float]:
+        """
+        Predict a chunking strategy.
+
+        Args:
+            analysis: Document analysis dictionary
+
+        Returns:
+            Tuple of (strategy, confidence); (None, 0.0) without a model
+        """
+        if self.model is None:
+            return None, 0.0
+        probabilities = self.model.predict_proba([feature_vector(analysis)])[0]
+        best = int(probabilities.argmax())
+        return str(self.model.classes_[best]), float(probabilities[best])
+
+
+def train_strategy_classifier(
+    analyses: Sequence[Dict[str, Any]],
+    decisions: Sequence[str],
+    model_path: Optional[str] = None,
+):
+    """
+    Fit a classifier on recorded (analysis, LLM decision) pairs and save it.
+
+    Args:
+        analyses: Document analysis dictionaries
+        decisions: Strategy chosen for each document
+        model_path: Output path (default: settings.strategy_classifier_path)
+
+    Returns:
+        The fitted model
+    """
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+    model.fit([feature_vector(a) for a in analyses], list(decisions))
+    joblib.dump(model, model_path or settings.strategy_classifier_path)
+    return model
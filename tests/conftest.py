@@ -0,0 +1,87 @@
+"""Shared test fixtures."""
+
+import pytest
+from sqlalchemy.orm import Session
+from src.chunking.strategies import FixedChunker, DynamicChunker, IntelligentChunker
+from src.database.connection import db_manager
+
+
+@pytest.fixture(scope="module")
+def fixed_chunker():
+    """Fixed-size chunker shared by a test module."""
+    return FixedChunker(chunk_size=100, overlap=10)
+
+
+@pytest.fixture(scope="module")
+def dynamic_chunker():
+    """Dynamic chunker shared by a test module."""
+    return DynamicChunker(max_chunk_size=200, min_chunk_size=50)
+
+
+@pytest.fixture(scope="module")
+def intelligent_chunker(fixed_chunker, dynamic_chunker):
+    """Intelligent chunker built on the shared fixed and dynamic chunkers."""
+    return IntelligentChunker(fixed_chunker, dynamic_chunker)
+
+
+@pytest.fixture(scope="session")
+def generator():
+    """Embedding generator shared by the test session (model loads once)."""
+    # Imported here so non-embedding tests don't need the model stack
+    from src.embeddings.generator import EmbeddingGenerator
+    
+    return EmbeddingGenerator()
+
+
+@pytest.fixture(scope="session")
+def embeddings_by_text(generator):
+    """Embeddings for texts shared by several tests, computed in one batched call."""
+    texts = [
+        "Test text",
+        "Consistency test text.",
+        "First text.",
+        "Second text.",
+    ]
+    return dict(zip(texts, generator.embed_text(texts)))
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Database manager initialized once for the test session."""
+    db_manager.init_db()
+    return db_manager
+
+
+@pytest.fixture
+def session(database):
+    """Session whose writes are rolled back after each test."""
+    connection = database.engine.connect()
+    transaction = connection.begin()
+    # Repository commits only release savepoints inside the outer transaction
+    db_session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    
+    yield db_session
+    
+    db_session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """API test client shared by the test session (app starts up once)."""
+    # Imported here so non-API tests don't need the web stack
+    from fastapi.testclient import TestClient
+    from src.api.main import app
+    
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def reset_rate_limits():
+    """Clear rate-limit counters after a test so they don't bleed into others."""
+    from src.api.main import limiter
+    
+    yield
+    limiter.reset()
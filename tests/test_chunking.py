@@ -8,9 +8,9 @@ from src.models.document import Document, DocumentMetadata, ChunkingStrategy
 class TestFixedChunker:
     """Tests for fixed-size chunking."""
     
-    def test_fixed_chunking_basic(self):
+    def test_fixed_chunking_basic(self, fixed_chunker):
         """Test basic fixed chunking."""
-        chunker = FixedChunker(chunk_size=100, overlap=10)
+        chunker = fixed_chunker
         doc = Document(
             id="test1",
             filename="test.txt",
@@ -44,9 +44,9 @@ class TestFixedChunker:
 class TestDynamicChunker:
     """Tests for dynamic chunking."""
     
-    def test_dynamic_chunking_with_headings(self):
+    def test_dynamic_chunking_with_headings(self, dynamic_chunker):
         """Test dynamic chunking with markdown headings."""
-        chunker = DynamicChunker(max_chunk_size=200, min_chunk_size=50)
+        chunker = dynamic_chunker
         content = """# Heading 1
 Content under heading 1.
 
@@ -82,16 +82,27 @@ More content here."""
         chunks = chunker.chunk(doc)
         assert len(chunks) > 1  # Should split into multiple chunks
 
+    def test_iter_chunks_matches_chunk(self, dynamic_chunker):
+        """Test that streamed chunks match the list form, indices included."""
+        content = "# Heading\n\n" + "Large paragraph. " * 100 + "\n\n## Next\n\nShort."
+        doc = Document(
+            id="test4b",
+            filename="test.txt",
+            file_type="txt",
+            content=content,
+            metadata=DocumentMetadata(),
+        )
+        streamed = list(dynamic_chunker.iter_chunks(doc))
+        chunks = dynamic_chunker.chunk(doc)
+        assert [c.content for c in streamed] == [c.content for c in chunks]
+        assert [c.metadata.chunk_index for c in streamed] == list(range(len(chunks)))
+
 
 class TestIntelligentChunker:
     """Tests for intelligent chunking strategy selection."""
     
-    def test_auto_select_fixed_for_simple_text(self):
+    def test_auto_select_fixed_for_simple_text(self, intelligent_chunker):
         """Test auto-selection of fixed chunking for simple text."""
-        fixed_chunker = FixedChunker(chunk_size=100, overlap=10)
-        dynamic_chunker = DynamicChunker(max_chunk_size=200, min_chunk_size=50)
-        chunker = IntelligentChunker(fixed_chunker, dynamic_chunker)
-        
         # Simple text without structure
         doc = Document(
             id="test5",
@@ -100,15 +111,11 @@ class TestIntelligentChunker:
             content="Simple text without structure. " * 20,
             metadata=DocumentMetadata(),
         )
-        strategy = chunker.analyze_document(doc)
+        strategy = intelligent_chunker.analyze_document(doc)
         assert strategy in [ChunkingStrategy.FIXED, ChunkingStrategy.DYNAMIC]
     
-    def test_auto_select_dynamic_for_structured_text(self):
+    def test_auto_select_dynamic_for_structured_text(self, intelligent_chunker):
         """Test auto-selection of dynamic chunking for structured text."""
-        fixed_chunker = FixedChunker(chunk_size=100, overlap=10)
-        dynamic_chunker = DynamicChunker(max_chunk_size=200, min_chunk_size=50)
-        chunker = IntelligentChunker(fixed_chunker, dynamic_chunker)
-        
         # Structured text with headings
         content = """# Chapter 1
 Content here.
@@ -126,15 +133,11 @@ Final content."""
             content=content,
             metadata=DocumentMetadata(),
         )
-        strategy = chunker.analyze_document(doc)
+        strategy = intelligent_chunker.analyze_document(doc)
         assert strategy in [ChunkingStrategy.FIXED, ChunkingStrategy.DYNAMIC]
     
-    def test_intelligent_chunking(self):
+    def test_intelligent_chunking(self, intelligent_chunker):
         """Test end-to-end intelligent chunking."""
-        fixed_chunker = FixedChunker(chunk_size=100, overlap=10)
-        dynamic_chunker = DynamicChunker(max_chunk_size=200, min_chunk_size=50)
-        chunker = IntelligentChunker(fixed_chunker, dynamic_chunker)
-        
         doc = Document(
             id="test7",
             filename="test.txt",
@@ -142,7 +145,7 @@ Final content."""
             content="Test content. " * 50,
             metadata=DocumentMetadata(),
         )
-        chunks = chunker.chunk(doc)
+        chunks = intelligent_chunker.chunk(doc)
         assert len(chunks) > 0
         assert doc.chunking_strategy is not None
 
@@ -150,11 +153,10 @@ Final content."""
 class TestChunkMetadata:
     """Tests for chunk metadata."""
     
-    def test_chunk_metadata_arabic(self):
+    def test_chunk_metadata_arabic(self, fixed_chunker):
         """Test Arabic detection in chunks."""
         from src.utils.text_utils import detect_arabic
         
-        chunker = FixedChunker(chunk_size=100, overlap=10)
         doc = Document(
             id="test8",
             filename="test.txt",
@@ -162,13 +164,12 @@ class TestChunkMetadata:
             content="مرحبا بالعالم",
             metadata=DocumentMetadata(),
         )
-        chunks = chunker.chunk(doc)
+        chunks = fixed_chunker.chunk(doc)
         if chunks:
             assert chunks[0].metadata.has_arabic == detect_arabic(chunks[0].content)
     
-    def test_chunk_metadata_token_count(self):
+    def test_chunk_metadata_token_count(self, fixed_chunker):
         """Test token count in chunks."""
-        chunker = FixedChunker(chunk_size=100, overlap=10)
         doc = Document(
             id="test9",
             filename="test.txt",
@@ -176,7 +177,27 @@ class TestChunkMetadata:
             content="Word " * 50,
             metadata=DocumentMetadata(),
         )
-        chunks = chunker.chunk(doc)
+        chunks = fixed_chunker.chunk(doc)
         if chunks:
             assert chunks[0].metadata.token_count > 0
             assert chunks[0].metadata.char_count == len(chunks[0].content)
+
+
+class TestStrategyClassifier:
+    """Tests for the distilled chunking-strategy classifier."""
+    
+    def test_document_features(self):
+        """Test structural features used by the classifier."""
+        from src.workflows.strategy_classifier import document_features, feature_vector
+        features = document_features("# Title\n\nabcd\n## Section\n")
+        assert features["heading_count"] == 2
+        assert features["avg_line_length"] == pytest.approx((7 + 4 + 10) / 3)
+        vector = feature_vector({"language": "ar", "has_arabic": True, "word_count": 5, **features})
+        assert vector == [1.0, 1.0, 5.0, 2.0, features["avg_line_length"]]
+    
+    def test_predict_without_model(self):
+        """Test that a missing model yields no confident prediction."""
+        from src.workflows.strategy_classifier import StrategyClassifier
+        classifier = StrategyClassifier(model_path="does/not/exist.joblib")
+        assert not classifier.available
+        assert classifier.predict({"word_count": 100}) == (None, 0.0)
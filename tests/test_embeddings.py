@@ -1,30 +1,31 @@
 """Tests for embedding generation."""
 
 import pytest
+import numpy as np
 from src.embeddings.generator import EmbeddingGenerator
 
 
 class TestEmbeddingGenerator:
     """Tests for embedding generation."""
     
-    def test_init_generator(self):
+    def test_init_generator(self, generator):
         """Test initializing the embedding generator."""
-        generator = EmbeddingGenerator()
         assert generator.model is not None
+        # Further generators reuse the loaded model
+        assert EmbeddingGenerator().model is generator.model
     
-    def test_embed_single_text(self):
+    def test_embed_single_text(self, generator):
         """Test embedding a single text."""
-        generator = EmbeddingGenerator()
         text = "This is a test sentence for embedding."
         embedding = generator.embed_text(text)
         
         assert isinstance(embedding, list)
-        assert len(embedding) > 0
-        assert all(isinstance(x, float) for x in embedding)
+        assert len(embedding) == generator.get_embedding_dimension()
+        # tolist() yields Python floats throughout; checking one is enough
+        assert isinstance(embedding[0], float)
     
-    def test_embed_batch_texts(self):
+    def test_embed_batch_texts(self, generator):
         """Test embedding multiple texts."""
-        generator = EmbeddingGenerator()
         texts = [
             "First test sentence.",
             "Second test sentence.",
@@ -35,23 +36,21 @@ class TestEmbeddingGenerator:
         assert isinstance(embeddings, list)
         assert len(embeddings) == 3
         assert all(isinstance(e, list) for e in embeddings)
-        assert all(len(e) > 0 for e in embeddings)
+        assert all(len(e) == generator.get_embedding_dimension() for e in embeddings)
+        assert isinstance(embeddings[0][0], float)
     
-    def test_embedding_dimension(self):
+    def test_embedding_dimension(self, generator, embeddings_by_text):
         """Test embedding dimension."""
-        generator = EmbeddingGenerator()
-        text = "Test text"
-        embedding = generator.embed_text(text)
+        embedding = embeddings_by_text["Test text"]
         dimension = generator.get_embedding_dimension()
         
         assert len(embedding) == dimension
         assert dimension > 0
     
-    def test_embed_chunks(self):
+    def test_embed_chunks(self, generator):
         """Test embedding chunks."""
         from src.models.document import Chunk, ChunkMetadata
         
-        generator = EmbeddingGenerator()
         chunks = [
             Chunk(
                 id=f"chunk_{i}",
@@ -71,30 +70,238 @@ class TestEmbeddingGenerator:
         assert len(result) == 3
         assert all(c.embedding is not None for c in result)
         assert all(len(c.embedding) > 0 for c in result)
+        assert all(c.embedding.dtype == np.float32 for c in result)
+    
+    def test_embed_chunks_keeps_order(self, generator):
+        """Test that length-sorted encoding still assigns each chunk its own vector."""
+        from src.models.document import Chunk, ChunkMetadata
+        
+        contents = ["A much longer chunk of content here.", "Short.", "Medium chunk."]
+        chunks = [
+            Chunk(
+                id=f"chunk_{i}",
+                document_id="test_doc",
+                content=content,
+                metadata=ChunkMetadata(
+                    chunk_index=i,
+                    token_count=10,
+                    char_count=len(content),
+                ),
+            )
+            for i, content in enumerate(contents)
+        ]
+        
+        generator.embed_chunks(chunks)
+        
+        expected = generator.embed_text(contents)
+        assert all(np.array_equal(c.embedding, e) for c, e in zip(chunks, expected))
 
 
 class TestEmbeddingConsistency:
     """Tests for embedding consistency."""
     
-    def test_same_text_same_embedding(self):
+    def test_same_text_same_embedding(self, embeddings_by_text, monkeypatch):
         """Test that same text produces same embedding."""
-        generator = EmbeddingGenerator()
+        from src.config.settings import settings
         text = "Consistency test text."
         
-        embedding1 = generator.embed_text(text)
-        embedding2 = generator.embed_text(text)
+        embedding1 = embeddings_by_text[text]
+        # Fresh generator with no in-memory or disk cache, so the model runs again
+        monkeypatch.setattr(settings, "embedding_disk_cache_dir", "")
+        fresh = EmbeddingGenerator()
+        assert not fresh._cache
+        embedding2 = fresh.embed_text(text)
         
         # Embeddings should be identical
+        assert np.array_equal(np.asarray(embedding1), np.asarray(embedding2))
+    
+    def test_cached_texts_skip_model(self, generator, monkeypatch):
+        """Test that only uncached texts in a batch reach the model."""
+        encoded = []
+        encode = generator.model.encode
+        
+        def counting_encode(texts, **kwargs):
+            encoded.extend(texts)
+            return encode(texts, **kwargs)
+        
+        monkeypatch.setattr(generator.model, "encode", counting_encode)
+        first = generator.embed_text("Cached text.")
+        embeddings = generator.embed_text(["Cached text.", "New text."])
+        
+        assert encoded == ["Cached text.", "New text."]
+        assert embeddings[0] == first
+        
+        # Repeats inside one call are encoded once
+        repeated = generator.embed_text(["Repeated text."] * 3)
+        assert encoded[2:] == ["Repeated text."]
+        assert repeated[0] == repeated[1] == repeated[2]
+    
+    def test_cache_safe_across_threads(self, generator, monkeypatch):
+        """Test that concurrent callers can share and evict the cache."""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.embeddings import generator as generator_module
+        
+        monkeypatch.setattr(generator_module, "EMBEDDING_CACHE_SIZE", 8)
+        texts = [f"Threaded text {i}." for i in range(32)]
+        
+        def embed(offset):
+            for _ in range(20):
+                generator.embed_text(texts[offset:offset + 12])
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(embed, range(0, 20, 2)))
+        assert len(generator._cache) <= 8
+    
+    def test_int8_cache_consistent(self, generator, monkeypatch):
+        """Test that an int8 cache returns the same approximate vector on every call."""
+        from src.config.settings import settings
+        monkeypatch.setattr(settings, "embedding_cache_dtype", "int8")
+        
+        embedding1 = generator.embed_text("Quantized cache text.")
+        embedding2 = generator.embed_text("Quantized cache text.")
+        
         assert embedding1 == embedding2
+        assert any(isinstance(entry, tuple) for entry in generator._cache.values())
     
-    def test_different_text_different_embedding(self):
+    def test_different_text_different_embedding(self, embeddings_by_text):
         """Test that different text produces different embedding."""
-        generator = EmbeddingGenerator()
-        text1 = "First text."
-        text2 = "Second text."
-        
-        embedding1 = generator.embed_text(text1)
-        embedding2 = generator.embed_text(text2)
+        embedding1 = embeddings_by_text["First text."]
+        embedding2 = embeddings_by_text["Second text."]
         
         # Embeddings should be different
-        assert embedding1 != embedding2
+        assert not np.array_equal(np.asarray(embedding1), np.asarray(embedding2))
+    
+    def test_query_embedding_cached(self, generator):
+        """Test that repeated and diacritic-only query variants share a cached vector."""
+        
+        embedding1 = generator.embed_query("السَّلامُ عليكم")
+        embedding2 = generator.embed_query("السلام عليكم")
+        
+        assert embedding1 is embedding2
+        assert embedding1.dtype == np.float32
+    
+    def test_query_embedding_encodes_original_text(self, generator, monkeypatch):
+        """Test that the normalized query is only the cache key, not the encoded text."""
+        encoded = []
+        encode = generator.model.encode
+        
+        def counting_encode(texts, **kwargs):
+            encoded.extend(texts)
+            return encode(texts, **kwargs)
+        
+        monkeypatch.setattr(generator.model, "encode", counting_encode)
+        generator.embed_query("هذا كتاب")
+        
+        assert encoded == ["هذا كتاب"]
+
+
+class TestAsyncEmbeddingBatcher:
+    """Tests for cross-request embedding batching."""
+    
+    def test_batcher_coalesces_and_keeps_order(self):
+        """Test that concurrent submissions share one length-sorted dispatch."""
+        import asyncio
+        from types import SimpleNamespace
+        from src.embeddings.batcher import AsyncEmbeddingBatcher
+        
+        calls = []
+        
+        class FakeEmbedder:
+            def embed_text(self, texts, batch_size=32):
+                calls.append(list(texts))
+                return [[float(len(t))] for t in texts]
+        
+        batcher = AsyncEmbeddingBatcher(FakeEmbedder(), max_wait_ms=5)
+        docs = [
+            [SimpleNamespace(content="ccc"), SimpleNamespace(content="a")],
+            [SimpleNamespace(content="bb")],
+        ]
+        
+        async def run():
+            return await asyncio.gather(*[batcher.submit(d) for d in docs])
+        
+        results = asyncio.run(run())
+        assert results == [[[3.0], [1.0]], [[2.0]]]
+        assert calls == [["a", "bb", "ccc"]]
+
+
+class TestEmbeddingQuantization:
+    """Tests for compact embedding storage forms."""
+    
+    def test_int8_round_trip(self):
+        """Test int8 quantization keeps vectors close to the original."""
+        from src.embeddings.quantization import quantize_int8, dequantize_int8
+        vector = np.random.default_rng(0).standard_normal(1024).astype(np.float32)
+        data, scale = quantize_int8(vector)
+        assert len(data) == 1024
+        restored = dequantize_int8(data, scale)
+        assert np.max(np.abs(restored - vector)) <= scale / 2 + 1e-6
+    
+    def test_quantize_chunks_binary(self):
+        """Test binary quantization replaces the fp32 embedding with sign bits."""
+        from types import SimpleNamespace
+        from src.embeddings.quantization import quantize_chunks, binary_similarities
+        embedding = [0.5, -0.1, 0.2, -0.3, 0.0, 1.0, -1.0, 0.4]
+        chunk = SimpleNamespace(embedding=list(embedding), embedding_bits=None)
+        quantize_chunks([chunk], mode="binary")
+        assert chunk.embedding is None
+        assert chunk.embedding_bits == bytes([0b10100101])
+        assert binary_similarities(np.array(embedding), [chunk.embedding_bits])[0] == 1.0
+    
+    def test_quantize_chunks_int8_keeps_sign_bits(self):
+        """Test int8 quantization also stores the sign bits used for index search."""
+        from types import SimpleNamespace
+        from src.embeddings.quantization import binary_literal, quantize_chunks
+        embedding = [0.5, -0.1, 0.2, -0.3, 0.0, 1.0, -1.0, 0.4]
+        chunk = SimpleNamespace(
+            embedding=list(embedding), embedding_int8=None, embedding_scale=None, embedding_bits=None
+        )
+        quantize_chunks([chunk], mode="int8")
+        assert chunk.embedding is None
+        assert len(chunk.embedding_int8) == len(embedding)
+        assert chunk.embedding_bits == bytes([0b10100101])
+        assert binary_literal(embedding) == "10100101"
+
+
+class TestEmbeddingDiskCache:
+    """Tests for the persistent embedding cache."""
+    
+    def test_round_trip_partitioned_by_dimension(self, tmp_path):
+        """Test that saved vectors load back from the dimension partition."""
+        from src.embeddings.disk_cache import EmbeddingDiskCache
+        cache = EmbeddingDiskCache(str(tmp_path), "model-a", 4)
+        vector = np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32)
+        
+        assert cache.get("text") is None
+        cache.put("text", vector)
+        
+        assert np.array_equal(cache.get("text"), vector)
+        assert list((tmp_path / "4").rglob("*.npy"))
+        # Other models never see this entry
+        assert EmbeddingDiskCache(str(tmp_path), "model-b", 4).get("text") is None
+    
+    def test_expired_entries_ignored(self, tmp_path):
+        """Test that entries older than the TTL are treated as missing."""
+        import os
+        from src.embeddings.disk_cache import EmbeddingDiskCache
+        cache = EmbeddingDiskCache(str(tmp_path), "model", 2, ttl_seconds=60)
+        cache.put("text", np.zeros(2, dtype=np.float32))
+        path = next(tmp_path.rglob("*.npy"))
+        os.utime(path, (0, 0))
+        
+        assert cache.get("text") is None
+    
+    def test_failed_write_removes_temp_file(self, tmp_path, monkeypatch):
+        """Test that a failed write leaves no temp file and isn't raised."""
+        import os
+        from src.embeddings.disk_cache import EmbeddingDiskCache
+        cache = EmbeddingDiskCache(str(tmp_path), "model", 2)
+        
+        def failing_replace(src, dst):
+            raise OSError("disk full")
+        
+        monkeypatch.setattr(os, "replace", failing_replace)
+        cache.put("text", np.zeros(2, dtype=np.float32))
+        
+        assert not [p for p in tmp_path.rglob("*") if p.is_file()]
+        assert cache.get("text") is None
@@ -0,0 +1,102 @@
+"""Tests for retrieval result handling."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.rag.retriever import VectorRetriever
+
+
+def _chunks(*ids):
+    return [SimpleNamespace(id=chunk_id) for chunk_id in ids]
+
+
+class TestCombineResults:
+    """Tests for merging vector and keyword results."""
+    
+    def combine(self, vector_ids, keyword_ids, top_k):
+        results = VectorRetriever._combine_results(
+            None, _chunks(*vector_ids), _chunks(*keyword_ids), 0.7, 0.3, top_k=top_k
+        )
+        return [c.id for c in results]
+    
+    def test_top_k_selects_best_scores(self):
+        """Test that chunks found by both searches rank first."""
+        assert self.combine(["a", "b", "c"], ["b", "d"], top_k=2) == ["b", "a"]
+    
+    def test_non_positive_top_k_returns_nothing(self):
+        """Test that top_k of zero or less yields no results."""
+        assert self.combine(["a", "b"], ["c"], top_k=0) == []
+        assert self.combine(["a", "b"], ["c"], top_k=-1) == []
+    
+    def test_ties_at_cut_keep_earliest(self):
+        """Test that tied scores at the top-k boundary keep appearance order."""
+        assert self.combine(["a", "b", "c", "d"], [], top_k=4) == ["a", "b", "c", "d"]
+        assert self.combine(["a", "b"], ["c", "d"], top_k=3) == ["a", "b", "c"]
+
+
+class TestRetrieverSelection:
+    """Tests for choosing the sync or async retrieval path."""
+    
+    def test_sync_retrieve_uses_given_session(self, monkeypatch):
+        """Test that sync callers stay on their session even with an async engine."""
+        from src.database.connection import db_manager
+        from src.rag import retriever
+        
+        monkeypatch.setattr(retriever, "get_embedding_generator", lambda: SimpleNamespace(
+            get_embedding_dimension=lambda: 3
+        ))
+        monkeypatch.setattr(db_manager, "AsyncSessionLocal", object(), raising=False)
+        session = object()
+        wrapper = retriever.Retriever(session)
+        assert type(wrapper.vector_retriever) is VectorRetriever
+        assert wrapper.vector_retriever.session is session
+    
+    def test_async_retrieve_uses_concurrent_path(self, monkeypatch):
+        """Test that async callers get the concurrent hybrid search."""
+        import asyncio
+        from src.database.connection import db_manager
+        from src.rag import retriever
+        
+        monkeypatch.setattr(retriever, "get_embedding_generator", lambda: SimpleNamespace(
+            get_embedding_dimension=lambda: 3
+        ))
+        monkeypatch.setattr(db_manager, "AsyncSessionLocal", object(), raising=False)
+        calls = []
+        
+        async def ahybrid_retrieve(self, **kwargs):
+            calls.append(kwargs)
+            return ["chunk"]
+        
+        monkeypatch.setattr(retriever.AsyncVectorRetriever, "ahybrid_retrieve", ahybrid_retrieve)
+        wrapper = retriever.Retriever(object())
+        assert asyncio.run(wrapper.aretrieve("question", top_k=3)) == ["chunk"]
+        assert calls == [{"query": "question", "top_k": 3, "document_id": None, "filters": None}]
+
+
+class TestQuantizedCandidates:
+    """Tests for the quantized-embedding candidate query."""
+    
+    def compile(self, dialect_name, monkeypatch):
+        from sqlalchemy.dialects import postgresql, sqlite
+        from src.config.settings import settings
+        from src.rag.retriever import _quantized_candidates_stmt
+        
+        monkeypatch.setattr(settings, "embedding_quantization", "int8")
+        stmt = _quantized_candidates_stmt(
+            np.array([0.5, -0.5]), 5, dialect_name, filters={"has_arabic": True}
+        )
+        dialect = postgresql.dialect() if dialect_name == "postgresql" else sqlite.dialect()
+        return str(stmt.compile(dialect=dialect))
+    
+    def test_postgresql_uses_bounded_hamming_search(self, monkeypatch):
+        """Test that PostgreSQL candidates come from the Hamming index, not a full scan."""
+        sql = self.compile("postgresql", monkeypatch)
+        assert "embedding_bit <~> CAST(" in sql
+        assert "LIMIT" in sql
+    
+    def test_other_databases_scan_all_rows(self, monkeypatch):
+        """Test that the SQLite fallback selects every quantized row."""
+        sql = self.compile("sqlite", monkeypatch)
+        assert "embedding_bit" not in sql
+        assert "LIMIT" not in sql
@@ -6,10 +6,12 @@ from src.utils.text_utils import (
     detect_diacritics,
     remove_diacritics,
     normalize_arabic_text,
+    normalize_for_search,
     count_arabic_words,
     extract_sentences,
     clean_whitespace,
     estimate_tokens,
+    analyze_text,
 )
 
 
@@ -61,6 +63,20 @@ class TestNormalization:
         result = normalize_arabic_text(text)
         assert "أ" not in result  # Alef variants normalized
         assert "ة" in result  # Heh variants normalized
+    
+    def test_normalize_arabic_variants(self):
+        """Test presentation forms, hamza carriers, tatweel and digits are folded."""
+        assert normalize_arabic_text("ﻻ") == "لا"
+        assert normalize_arabic_text("مسؤول") == "مسوول"
+        assert normalize_arabic_text("قائمة") == "قايمة"
+        assert normalize_arabic_text("ٱلكتاب") == "الكتاب"
+        assert normalize_arabic_text("جـــميل") == "جميل"
+        assert normalize_arabic_text("٢٠٢٤ ۱۲") == "2024 12"
+    
+    def test_normalize_for_search(self):
+        """Test search normalization ignores diacritics, punctuation and case."""
+        assert normalize_for_search("السَّلامُ عليكم") == normalize_for_search("السلام عليكم")
+        assert normalize_for_search("Hello, World!") == "hello  world "
 
 
 class TestWordCount:
@@ -120,3 +136,57 @@ class TestTokenEstimation:
         text = "Hello World" * 10
         tokens = estimate_tokens(text)
         assert tokens > 0
+    
+    def test_estimate_tokens_ratios(self):
+        """Test that Arabic text is estimated at more tokens per character."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("ab") == 1
+        assert estimate_tokens("a" * 40) == 10
+        assert estimate_tokens("م" * 40) == 16
+    
+    def test_encoder_load_failure_not_cached(self, monkeypatch):
+        """Test that a failed tokenizer load is retried instead of remembered."""
+        tiktoken = pytest.importorskip("tiktoken")
+        from src.utils import text_utils
+        
+        monkeypatch.setattr(text_utils, "_TOKEN_ENCODERS", {})
+        encoder = object()
+        attempts = []
+        
+        def encoding_for_model(model):
+            raise KeyError(model)
+        
+        def get_encoding(name):
+            attempts.append(name)
+            if len(attempts) == 1:
+                raise ConnectionError("download failed")
+            return encoder
+        
+        monkeypatch.setattr(tiktoken, "encoding_for_model", encoding_for_model)
+        monkeypatch.setattr(tiktoken, "get_encoding", get_encoding)
+        assert text_utils.get_token_encoder("claude-3") is None
+        assert text_utils.get_token_encoder("claude-3") is encoder
+        assert text_utils.get_token_encoder("claude-3") is encoder
+        assert len(attempts) == 2
+
+
+class TestAnalyzeText:
+    """Tests for combined text analysis."""
+    
+    def test_analyze_matches_individual_functions(self):
+        """Test that combined stats agree with the single-purpose helpers."""
+        texts = [
+            "Hello World",
+            "السَّلامُ عليكم and hello",
+            "",
+            "abcمرحبا\u00a0x\u3000كتابً",
+            "\ufb51\ufefc  déjà vu\t\n",
+            "a b c d e f g h i j س",
+        ]
+        for text in texts:
+            stats = analyze_text(text)
+            assert stats.has_arabic == detect_arabic(text)
+            assert stats.has_diacritics == detect_diacritics(text)
+            assert stats.arabic_word_count == count_arabic_words(text)
+            assert stats.char_count == len(text)
+            assert stats.token_count == estimate_tokens(text)
@@ -0,0 +1,285 @@
+"""Tests for the document processing workflow."""
+
+import asyncio
+import inspect
+import json
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import openai
+import pytest
+from tenacity import wait_none
+
+from src.chunking.strategies import FixedChunker
+from src.config.settings import settings
+from src.models.document import Document, DocumentMetadata
+from src.workflows import document_workflow
+from src.workflows.document_workflow import (
+    DocumentProcessingWorkflow,
+    _heuristic_decide,
+    _parse_decision,
+)
+
+
+class FakeLLM:
+    """Router LLM stub that returns (or raises) canned completions in order."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    async def acomplete(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(text=answer)
+
+
+class FakeBatcher:
+    """Embedding batcher stub that embeds each chunk as its chunk index."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def submit(self, chunks):
+        self.batches.append(list(chunks))
+        return [np.array([chunk.metadata.chunk_index], dtype=np.float32) for chunk in chunks]
+
+
+def make_document(content, word_count=None, doc_id="doc1"):
+    """Build a document with just enough metadata for the decision path."""
+    return Document(
+        id=doc_id,
+        filename="test.txt",
+        file_type="txt",
+        content=content,
+        metadata=DocumentMetadata(title="Test", language="en", word_count=word_count),
+    )
+
+
+@pytest.fixture
+def workflow():
+    """Fresh workflow per test so caches don't leak between tests."""
+    return DocumentProcessingWorkflow()
+
+
+@pytest.fixture
+def llm_workflow(workflow, monkeypatch):
+    """Workflow that always falls through to the (stubbed) router LLM."""
+    monkeypatch.setattr(settings, "use_llm_decision", True)
+    monkeypatch.setattr(settings, "decision_semantic_cache", False)
+    workflow.components.classifier = SimpleNamespace(predict=lambda features: (None, 0.0))
+    return workflow
+
+
+class TestDecisionLLM:
+    """Tests for the router LLM chunking decision."""
+
+    def test_decision_kwargs_have_no_logit_bias(self, workflow):
+        """Test that decoding is capped but not biased toward label tokens."""
+        workflow.components.router_llm = FakeLLM()
+        kwargs = workflow.components.decision_llm_kwargs
+        assert "logit_bias" not in kwargs
+        assert kwargs["max_tokens"] == 4
+        assert kwargs["temperature"] == 0
+
+    @pytest.mark.parametrize("answer, expected", [
+        ("fixed", "fixed"),
+        ("Dynamic.", "dynamic"),
+        (" fixed\n", "fixed"),
+        ("fixedfixed", "intelligent"),
+    ])
+    def test_stubbed_completion_parses(self, workflow, answer, expected):
+        """Test that a completion goes through _ask_llm and _parse_decision."""
+        workflow.components.router_llm = FakeLLM(answer)
+        text = asyncio.run(workflow._ask_llm("prompt"))
+        assert _parse_decision(text) == expected
+
+    def test_retries_transient_errors(self, workflow, monkeypatch):
+        """Test that retryable provider errors are retried until an answer arrives."""
+        monkeypatch.setattr(DocumentProcessingWorkflow._ask_llm.retry, "wait", wait_none())
+        error = openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        workflow.components.router_llm = FakeLLM(error, error, "dynamic")
+        assert asyncio.run(workflow._ask_llm("prompt", document_id="doc1")) == "dynamic"
+        assert len(workflow.components.router_llm.calls) == 3
+
+    def test_does_not_retry_other_errors(self, workflow, monkeypatch):
+        """Test that non-transient errors surface on the first attempt."""
+        monkeypatch.setattr(DocumentProcessingWorkflow._ask_llm.retry, "wait", wait_none())
+        workflow.components.router_llm = FakeLLM(ValueError("bad request"), "fixed")
+        with pytest.raises(ValueError):
+            asyncio.run(workflow._ask_llm("prompt"))
+        assert len(workflow.components.router_llm.calls) == 1
+
+
+class TestHeuristicDecision:
+    """Tests for the LLM-free fast path."""
+
+    def test_short_document_is_fixed(self):
+        """Test that documents under the word threshold use fixed chunking."""
+        threshold = settings.llm_fastpath_word_threshold
+        assert _heuristic_decide(make_document("# Title\nshort", word_count=threshold - 1)) == "fixed"
+
+    def test_headings_are_dynamic(self):
+        """Test that markdown headings select dynamic chunking."""
+        threshold = settings.llm_fastpath_word_threshold
+        document = make_document("Intro\n\n## Section\nBody", word_count=threshold)
+        assert _heuristic_decide(document) == "dynamic"
+
+    def test_ambiguous_document_defers(self):
+        """Test that long unstructured documents are left to the LLM."""
+        threshold = settings.llm_fastpath_word_threshold
+        assert _heuristic_decide(make_document("Plain text. " * 10, word_count=threshold)) is None
+        assert _heuristic_decide(make_document("#hashtag, not a heading")) is None
+
+
+class TestQuickDecision:
+    """Tests for settling decisions before the LLM."""
+
+    def test_missing_classifier_defers_to_llm(self, workflow):
+        """Test that default settings ask the LLM when no classifier model exists."""
+        workflow.components.router_llm = FakeLLM()
+        assert not workflow.components.classifier.available
+        document = make_document("Plain text. " * 500, word_count=1000)
+        workflow._analyze_document(document)
+        assert workflow._quick_decision(document) is None
+
+    def test_llm_disabled_falls_back_to_intelligent(self, workflow, monkeypatch):
+        """Test that turning the LLM off settles undecided documents locally."""
+        monkeypatch.setattr(settings, "use_llm_decision", False)
+        workflow.components.router_llm = FakeLLM()
+        document = make_document("Plain text. " * 500, word_count=1000)
+        workflow._analyze_document(document)
+        assert workflow._quick_decision(document) == "intelligent"
+
+
+class TestDecisionCache:
+    """Tests for reusing LLM chunking decisions."""
+
+    def test_repeat_document_skips_llm(self, llm_workflow):
+        """Test that a second identical document is answered from the cache."""
+        llm_workflow.components.router_llm = FakeLLM("dynamic")
+        document = make_document("Plain text. " * 500, word_count=1000)
+
+        llm_workflow._analyze_document(document)
+        assert llm_workflow._quick_decision(document) is None
+        assert asyncio.run(llm_workflow._llm_decision(document)) == "dynamic"
+
+        again = make_document("Plain text. " * 500, word_count=1000, doc_id="doc2")
+        llm_workflow._analyze_document(again)
+        assert llm_workflow._quick_decision(again) == "dynamic"
+        assert len(llm_workflow.components.router_llm.calls) == 1
+
+    def test_lru_eviction(self, workflow, monkeypatch):
+        """Test that the exact cache drops its least recently used entry."""
+        monkeypatch.setattr(document_workflow, "DECISION_CACHE_SIZE", 2)
+        workflow._store_decision("a", None, "fixed")
+        workflow._store_decision("b", None, "dynamic")
+        assert workflow._lookup_decision("a") == "fixed"
+        workflow._store_decision("c", None, "intelligent")
+        assert workflow._lookup_decision("b") is None
+        assert workflow._lookup_decision("a") == "fixed"
+
+
+class FakeAsyncOpenAI:
+    """AsyncOpenAI stub for a Batch API job that completes immediately."""
+
+    output = ""
+    requests = []
+
+    def __init__(self, **kwargs):
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=None)
+
+    async def _create_file(self, file, purpose):
+        FakeAsyncOpenAI.requests = [json.loads(line) for line in file[1].decode("utf-8").splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    async def _create_batch(self, **kwargs):
+        return SimpleNamespace(id="batch-1", status="completed", output_file_id="file-out")
+
+    async def _content(self, file_id):
+        return SimpleNamespace(text=self.output)
+
+    async def close(self):
+        pass
+
+
+class TestBatchDecisions:
+    """Tests for Batch API chunking decisions."""
+
+    def test_parses_batch_output(self, llm_workflow, monkeypatch):
+        """Test that batch results map back to documents and fill the cache."""
+        documents = [make_document(f"Plain text {i}. " * 50, doc_id=f"doc{i}") for i in range(3)]
+        for document in documents:
+            llm_workflow._analyze_document(document)
+        llm_workflow.components.router_llm = SimpleNamespace(model="gpt-4o-mini")
+
+        FakeAsyncOpenAI.output = "\n".join([
+            json.dumps({"custom_id": "doc0", "response": {"body": {"choices": [
+                {"message": {"content": "Fixed."}}
+            ]}}}),
+            json.dumps({"custom_id": "doc1", "response": {"body": {"choices": [
+                {"message": {"content": "something else"}}
+            ]}}}),
+            json.dumps({"custom_id": "doc2", "error": {"code": "server_error"}, "response": None}),
+            "",
+        ])
+        monkeypatch.setattr(openai, "AsyncOpenAI", FakeAsyncOpenAI)
+
+        decisions = asyncio.run(document_workflow._batch_decisions(llm_workflow, documents, 0))
+
+        assert decisions == {"doc0": "fixed", "doc1": "intelligent"}
+        assert [r["custom_id"] for r in FakeAsyncOpenAI.requests] == ["doc0", "doc1", "doc2"]
+        assert FakeAsyncOpenAI.requests[0]["body"]["max_tokens"] == 4
+        key = llm_workflow._decision_cache_key(documents[0])
+        assert llm_workflow._lookup_decision(key) == "fixed"
+
+
+class TestStreamingEmbeddings:
+    """Tests for embedding chunks while chunking is still running."""
+
+    def test_chunks_embedded_in_order(self, workflow):
+        """Test that streamed batches cover every chunk once, in order."""
+        batcher = FakeBatcher()
+        workflow.components.embedding_batcher = batcher
+        workflow.components.fixed_chunker = FixedChunker(chunk_size=20, overlap=0)
+        document = make_document("Short paragraph.\n\n" * 200)
+
+        async def run():
+            chunks, embedding_task = await workflow._chunk_and_embed(document, "fixed")
+            await embedding_task
+            return chunks
+
+        chunks = asyncio.run(run())
+
+        assert len(batcher.batches) > 1
+        streamed = [chunk for batch in batcher.batches for chunk in batch]
+        assert [c.id for c in streamed] == [c.id for c in chunks]
+        assert [float(c.embedding[0]) for c in chunks] == list(range(len(chunks)))
+        assert document.chunking_strategy == "fixed"
+
+
+class TestLazyComponents:
+    """Tests that workflow components are only built when first used."""
+
+    def test_step_discovery_does_not_build_components(self, monkeypatch):
+        """Test that inspecting the workflow (as step discovery does) loads nothing."""
+        from src.workflows import document_workflow
+
+        built = []
+        monkeypatch.setattr(
+            document_workflow, "get_embedding_generator", lambda: built.append("embedder") or object()
+        )
+        workflow = DocumentProcessingWorkflow()
+
+        inspect.getmembers(workflow)
+        if hasattr(workflow, "_get_steps"):
+            workflow._get_steps()
+        assert built == []
+
+        embedder = workflow.components.embedding_generator
+        assert built == ["embedder"]
+        assert workflow.components.embedding_generator is embedder